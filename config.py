@@ -72,6 +72,20 @@ class Config:
     # Redis configuration (used by RQ task queue & progress store)
     # ============================================
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    # Concurrent downloads run in-process when RQ is unavailable (extra
+    # requests queue up instead of each getting its own thread)
+    LOCAL_DOWNLOAD_WORKERS = int(os.getenv("LOCAL_DOWNLOAD_WORKERS", "2"))
+
+    # ============================================
+    # File delivery (reverse-proxy offload)
+    # ============================================
+    # When set (e.g. "/protected/"), finished files are handed to nginx via
+    # X-Accel-Redirect instead of being streamed through Flask. nginx needs a
+    # matching internal location aliased to the project directory, e.g.
+    #   location /protected/ { internal; alias /app/; }
+    X_ACCEL_REDIRECT_PREFIX = os.getenv("X_ACCEL_REDIRECT_PREFIX", "")
+    # Seconds to keep an offloaded file around before its temp dir is removed
+    X_ACCEL_CLEANUP_DELAY = int(os.getenv("X_ACCEL_CLEANUP_DELAY", "600"))
 
 
 class DevelopmentConfig(Config):
@@ -12,6 +12,9 @@ this file.
 from __future__ import annotations
 
 import concurrent.futures
+import contextlib
+import copy
+import functools
 import json as _json
 import logging
 import os
@@ -21,18 +24,26 @@ import tempfile
 import threading
 import time
 import unicodedata
-import urllib.parse
 import uuid
 import zipfile
+from collections import OrderedDict, deque
 from pathlib import Path
-from typing import Any, Callable
+from typing import TYPE_CHECKING, Any, Callable
 
 import redis as _redis
 import requests
-import spotipy
 import yt_dlp
-from spotipy.oauth2 import SpotifyClientCredentials
-from ytmusicapi import YTMusic
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from models.ModelFile import SPONSORBLOCK_CATEGORIES, VALID_SPONSORBLOCK_CATEGORIES
+
+# spotipy and ytmusicapi are imported lazily (on first client use) so that
+# importing this module — e.g. for an RQ worker or a one-off script — does
+# not pay for them up front.
+if TYPE_CHECKING:
+    import spotipy
+    from ytmusicapi import YTMusic
 
 # Proxy configuration is handled by the ProxyRotator class (see below).
 # Set PROXY_URL to one or more comma-separated proxy URLs.
@@ -47,8 +58,25 @@ except ImportError:
 
     _RAPIDFUZZ_AVAILABLE = False
 
+# Optional: orjson for faster JSON (progress store, SponsorBlock responses)
+try:
+    import orjson as _orjson
+
+    _json_dumps = _orjson.dumps
+    _json_loads = _orjson.loads
+except ImportError:
+    _json_dumps = _json.dumps
+    _json_loads = _json.loads
+
 logger = logging.getLogger(__name__)
 
+_WS_RE = re.compile(r"\s+")
+
+
+def _norm_ws(text: str) -> str:
+    """Collapse runs of whitespace to single spaces and strip the ends."""
+    return _WS_RE.sub(" ", text).strip()
+
 
 # ============================================
 # Custom exceptions
@@ -95,6 +123,11 @@ class ProxyRotator:
         r"No such file or directory.*cookie",
     ]
 
+    # All patterns folded into one alternation: a single scan per error.
+    _PROXY_ERROR_RE: re.Pattern[str] = re.compile(
+        "|".join(f"(?:{p})" for p in _PROXY_ERROR_PATTERNS), re.IGNORECASE
+    )
+
     def __init__(self) -> None:
         self._lock = threading.Lock()
         raw = os.getenv("PROXY_URL", "")
@@ -145,11 +178,7 @@ class ProxyRotator:
 
     def is_proxy_error(self, error: BaseException) -> bool:
         """Return *True* when *error* looks like a proxy / IP-block issue."""
-        msg = str(error)
-        for pattern in self._PROXY_ERROR_PATTERNS:
-            if re.search(pattern, msg, re.IGNORECASE):
-                return True
-        return False
+        return self._PROXY_ERROR_RE.search(str(error)) is not None
 
     # -- Internal helpers --
 
@@ -173,6 +202,47 @@ class ProxyRotator:
 # Module-level singleton created at import time.
 _proxy_rotator = ProxyRotator()
 
+# ffmpeg binary resolved once per process.  Handing yt-dlp the absolute path
+# spares every postprocessor from searching PATH again on each download.
+_FFMPEG_LOCATION: str | None = shutil.which("ffmpeg")
+
+# Read/write block size when streaming files into a ZIP archive.
+_ZIP_COPY_CHUNK = 1024 * 1024
+
+# Sentinel for lazily-initialised attributes ("not tried yet" vs. ``None``).
+_UNSET = object()
+
+# URL prefixes for items built per track (plain concatenation in the loops).
+_YT_WATCH_PREFIX = "https://www.youtube.com/watch?v="
+_YTM_WATCH_PREFIX = "https://music.youtube.com/watch?v="
+_YT_THUMB_PREFIX = "https://i.ytimg.com/vi/"
+_SPOTIFY_TRACK_PREFIX = "https://open.spotify.com/track/"
+
+
+# ============================================
+# Shared HTTP session (keep-alive connection pool)
+# ============================================
+
+
+def _build_http_session() -> requests.Session:
+    """Return a pooled ``requests.Session`` with light retry/backoff.
+
+    Reusing one session keeps TCP/TLS connections alive across calls instead
+    of paying a fresh handshake for every small API request.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.3, allowed_methods=["GET"]),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_http_session = _build_http_session()
+
 
 # ============================================
 # Thread-safe TTL cache
@@ -182,10 +252,15 @@ _CACHE_MISS = object()
 
 
 class _TTLCache:
-    """Bounded, thread-safe cache with per-entry TTL expiry."""
+    """Bounded, thread-safe LRU cache with per-entry TTL expiry.
+
+    Entries are kept in recency order so both lookups and evictions are
+    O(1); expired entries are dropped lazily when they are touched or when
+    they reach the cold end of the queue.
+    """
 
     def __init__(self, maxsize: int = 256, ttl: float = 600.0) -> None:
-        self._data: dict[Any, tuple[float, Any]] = {}
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
         self._lock = threading.Lock()
         self._maxsize = maxsize
         self._ttl = ttl
@@ -196,27 +271,34 @@ class _TTLCache:
             entry = self._data.get(key)
             if entry is not None:
                 ts, val = entry
-                if time.time() - ts < self._ttl:
+                if time.monotonic() - ts < self._ttl:
+                    self._data.move_to_end(key)
                     return val
                 del self._data[key]
         return _CACHE_MISS
 
     def put(self, key: Any, value: Any) -> None:
         with self._lock:
-            now = time.time()
-            # Purge expired
-            expired = [k for k, (ts, _) in self._data.items() if now - ts >= self._ttl]
-            for k in expired:
-                del self._data[k]
-            # Evict oldest if at capacity
-            while len(self._data) >= self._maxsize:
-                oldest_key = min(self._data, key=lambda k: self._data[k][0])
-                del self._data[oldest_key]
+            now = time.monotonic()
             self._data[key] = (now, value)
+            self._data.move_to_end(key)
+            # Drop expired entries from the cold end, then enforce capacity
+            while self._data:
+                oldest_key, (ts, _) = next(iter(self._data.items()))
+                if now - ts < self._ttl and len(self._data) <= self._maxsize:
+                    break
+                del self._data[oldest_key]
 
 
 _yt_search_cache = _TTLCache(maxsize=512, ttl=600.0)
 _ytm_search_cache = _TTLCache(maxsize=256, ttl=600.0)
+# Preview metadata per URL (only successful lookups are stored)
+_media_info_cache = _TTLCache(maxsize=1024, ttl=600.0)
+
+# Per-thread YoutubeDL instances for search-only calls.  Building a
+# YoutubeDL is not free and instances are not thread-safe, so each worker
+# thread keeps its own (see ``OfflinerCore._search_ydl``).
+_ydl_local = threading.local()
 
 
 # ============================================
@@ -263,9 +345,28 @@ class DownloadProgressStore:
 
     Each request_id maps to a Redis key ``progress:{request_id}`` holding a
     JSON-serialised dict.  Keys expire after ``_PROGRESS_TTL`` seconds.
+    Every write is also announced on ``progress-events:{request_id}`` so SSE
+    streams can block on pub/sub instead of polling the key.
     """
 
     _KEY_PREFIX: str = "progress:"
+    _CHANNEL_PREFIX: str = "progress-events:"
+
+    # Server-side merge of a JSON patch into the entry, keeping its TTL and
+    # notifying subscribers.  Atomic, so concurrent workers of one request
+    # can no longer overwrite each other's fields (GET/modify/SET race),
+    # and a single round-trip instead of two.  Entries only hold scalars,
+    # so cjson's empty-table ambiguity does not apply.
+    _MERGE_LUA: str = """
+local raw = redis.call('GET', KEYS[1])
+if not raw then return 0 end
+local data = cjson.decode(raw)
+for k, v in pairs(cjson.decode(ARGV[1])) do data[k] = v end
+redis.call('SET', KEYS[1], cjson.encode(data), 'KEEPTTL')
+redis.call('PUBLISH', ARGV[2], '1')
+return 1
+"""
+    _merge_script: Any = None
 
     # ------------------------------------------------------------------
     # Helpers
@@ -275,12 +376,40 @@ class DownloadProgressStore:
     def _key(cls, request_id: str) -> str:
         return f"{cls._KEY_PREFIX}{request_id}"
 
+    @classmethod
+    def _channel(cls, request_id: str) -> str:
+        return f"{cls._CHANNEL_PREFIX}{request_id}"
+
+    @classmethod
+    def _merge(cls, request_id: str, patch: dict) -> None:
+        """Atomically apply *patch* to an existing entry (no-op if missing)."""
+        r = get_redis()
+        if cls._merge_script is None:
+            cls._merge_script = r.register_script(cls._MERGE_LUA)
+        cls._merge_script(
+            keys=[cls._key(request_id)],
+            args=[_json_dumps(patch), cls._channel(request_id)],
+            client=r,
+        )
+
+    @classmethod
+    def _write(cls, r: _redis.Redis, request_id: str, data: dict, **kw: Any) -> None:
+        """Store *data* and notify subscribers in a single round-trip."""
+        pipe = r.pipeline(transaction=False)
+        pipe.set(cls._key(request_id), _json_dumps(data), **kw)
+        pipe.publish(cls._channel(request_id), b"1")
+        pipe.execute()
+
     # ------------------------------------------------------------------
     # Public API  (same signatures as the old in-memory implementation)
     # ------------------------------------------------------------------
 
     @classmethod
-    def create(cls, request_id: str, total_items: int = 1) -> None:
+    def create(cls, request_id: str, total_items: int = 1, **initial: Any) -> None:
+        """Create the progress entry; *initial* overrides default fields.
+
+        Passing known values here saves a follow-up read-modify-write.
+        """
         r = get_redis()
         data = {
             "percent": 0,
@@ -299,18 +428,13 @@ class DownloadProgressStore:
             # Flag that indicates a client requested cancellation (disconnect)
             "cancel_requested": False,
         }
-        r.set(cls._key(request_id), _json.dumps(data), ex=_PROGRESS_TTL)
+        data.update(initial)
+        cls._write(r, request_id, data, ex=_PROGRESS_TTL)
 
     @classmethod
     def request_cancel(cls, request_id: str) -> None:
         """Mark a running request as cancelled so worker threads can abort."""
-        r = get_redis()
-        raw = r.get(cls._key(request_id))
-        if raw is None:
-            return
-        data = _json.loads(raw)
-        data["cancel_requested"] = True
-        r.set(cls._key(request_id), _json.dumps(data), keepttl=True)
+        cls._merge(request_id, {"cancel_requested": True})
 
     @classmethod
     def is_cancelled(cls, request_id: str) -> bool:
@@ -318,18 +442,12 @@ class DownloadProgressStore:
         raw = r.get(cls._key(request_id))
         if raw is None:
             return False
-        data = _json.loads(raw)
+        data = _json_loads(raw)
         return bool(data.get("cancel_requested"))
 
     @classmethod
     def update(cls, request_id: str, **kwargs: Any) -> None:
-        r = get_redis()
-        raw = r.get(cls._key(request_id))
-        if raw is None:
-            return
-        data = _json.loads(raw)
-        data.update(kwargs)
-        r.set(cls._key(request_id), _json.dumps(data), keepttl=True)
+        cls._merge(request_id, kwargs)
 
     @classmethod
     def get(cls, request_id: str) -> dict:
@@ -345,12 +463,26 @@ class DownloadProgressStore:
                 "complete": False,
                 "error": "Session not found",
             }
-        return _json.loads(raw)
+        return _json_loads(raw)
 
     @classmethod
     def remove(cls, request_id: str) -> None:
         r = get_redis()
-        r.delete(cls._key(request_id))
+        pipe = r.pipeline(transaction=False)
+        pipe.delete(cls._key(request_id))
+        pipe.publish(cls._channel(request_id), b"1")
+        pipe.execute()
+
+    @classmethod
+    def subscribe(cls, request_id: str):
+        """Return a pub/sub handle that receives a message on every change.
+
+        Subscribe *before* the first :meth:`get` so no update is missed; the
+        caller must ``close()`` the handle.
+        """
+        pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(cls._channel(request_id))
+        return pubsub
 
 
 # ============================================
@@ -372,6 +504,8 @@ class _DownloadResult:
         "total_items",
         "completed_items",
         "request_id",
+        "_info_cache",
+        "_file_set",
     )
 
     def __init__(
@@ -389,36 +523,60 @@ class _DownloadResult:
         self.total_items: int = 0
         self.completed_items: int = 0
         self.request_id: str | None = request_id
+        self._info_cache: dict[str, dict] = {}
+        # Mirrors canciones_descargadas for O(1) duplicate checks
+        self._file_set: set[str] = set()
 
     # -- Thread-safe mutators --
 
-    def inc_success(self, mode: str) -> None:
+    def inc_error(self, mode: str) -> None:
         with self._lock:
             if mode == "audio":
-                self.audios_exito += 1
+                self.audios_error += 1
             else:
-                self.videos_exito += 1
+                self.videos_error += 1
 
-    def inc_error(self, mode: str) -> None:
+    def _append_file(self, path: str) -> None:
+        # Caller holds the lock.  Two items can resolve to the same output
+        # file; list it once so it is zipped (and deleted) only once.
+        if path not in self._file_set:
+            self._file_set.add(path)
+            self.canciones_descargadas.append(path)
+
+    def record_success(self, mode: str, path: str) -> None:
+        """Count a success and register its file under a single lock."""
         with self._lock:
             if mode == "audio":
-                self.audios_error += 1
+                self.audios_exito += 1
             else:
-                self.videos_error += 1
+                self.videos_exito += 1
+            self._append_file(path)
 
-    def add_file(self, path: str) -> None:
+    def get_info(self, url: str) -> dict | None:
+        """Pre-flight yt-dlp info already extracted for *url* this session."""
         with self._lock:
-            self.canciones_descargadas.append(path)
+            return self._info_cache.get(url)
+
+    def put_info(self, url: str, info: dict) -> None:
+        with self._lock:
+            self._info_cache[url] = info
+
+    def drop_info(self, url: str) -> None:
+        """Forget *url*'s info (its format URLs are signed for one proxy IP)."""
+        with self._lock:
+            self._info_cache.pop(url, None)
 
-    def inc_completed(self) -> None:
+    def inc_completed(self) -> int:
         with self._lock:
             self.completed_items += 1
+            return self.completed_items
 
     def get_progress_pct(self) -> int:
         with self._lock:
-            if self.total_items <= 0:
+            total = self.total_items
+            if total <= 0:
                 return 15
-            return 15 + int((self.completed_items / self.total_items) * 70)
+            return 15 + self.completed_items * 70 // total
 
 
 # ============================================
@@ -436,36 +594,135 @@ class OfflinerCore:
 
     # --- Class-level constants ------------------------------------------------
 
-    SPONSORBLOCK_CATEGORIES: dict[str, str] = {
-        "sponsor": "Sponsors (promociones pagadas)",
-        "intro": "Intros/Animaciones de entrada",
-        "outro": "Outros/Créditos finales",
-        "selfpromo": "Auto-promoción del creador",
-        "preview": "Previews/Avances",
-        "filler": "Relleno/Contenido no musical",
-        "interaction": "Recordatorios de suscripción/interacción",
-        "music_offtopic": "Partes sin música en videos musicales",
+    SPONSORBLOCK_CATEGORIES: dict[str, str] = SPONSORBLOCK_CATEGORIES
+
+    _SPONSORBLOCK_CATEGORY_KEYS: tuple[str, ...] = tuple(SPONSORBLOCK_CATEGORIES)
+    _SPONSORBLOCK_CATEGORY_SET: frozenset[str] = VALID_SPONSORBLOCK_CATEGORIES
+
+    # yt-dlp error messages that mean the SponsorBlock step (not the download
+    # itself) failed — "SponsorBlock" also covers "SponsorBlockPP".
+    _SPONSORBLOCK_ERROR_RE = re.compile(
+        r"SponsorBlock|unexpected keyword argument 'action'"
+    )
+
+    _SIDECAR_EXTENSIONS: frozenset[str] = frozenset(
+        (".jpg", ".png", ".webp", ".vtt", ".srt", ".ass")
+    )
+
+    # Containers that accept embedded cover art (yt-dlp/ffmpeg EmbedThumbnail)
+    _AUDIO_THUMBNAIL_FORMATS: frozenset[str] = frozenset(
+        ("mp3", "ogg", "opus", "flac", "m4a")
+    )
+    _VIDEO_THUMBNAIL_FORMATS: frozenset[str] = frozenset(
+        ("mp4", "m4v", "mov", "mkv", "mka")
+    )
+
+    # All "(Official Video)"-style tags folded into one alternation so a
+    # title is scanned once instead of once per pattern.
+    _VIDEO_TAG_RE = re.compile(
+        "|".join(
+            f"(?:{p})"
+            for p in (
+                r"\(Official\s*(Music\s*)?Video\)",
+                r"\(Official\s*Audio\)",
+                r"\(Official\s*Lyric\s*Video\)",
+                r"\(Video\s*Oficial\)",
+                r"\(Audio\s*Oficial\)",
+                r"\(Visualizer\)",
+                r"\[Official\s*(Music\s*)?Video\]",
+                r"\[Official\s*Audio\]",
+                r"\(HD\)",
+                r"\(HQ\)",
+                r"\(4K\)",
+                r"\(1080p\)",
+                r"\(720p\)",
+            )
+        ),
+        re.IGNORECASE,
+    )
+
+    # Separators dropped from search queries ("A | B #tag" -> "A B tag").
+    _QUERY_SEPARATORS_TABLE = str.maketrans("|#", "  ")
+
+    # Filename sanitisation (characters Windows rejects)
+    _INVALID_FILENAME_TABLE = str.maketrans("", "", '<>:"/\\|?*')
+
+    # Fuzzy-match normalisation
+    _BRACKETED_RE = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+    _NON_WORD_RE = re.compile(r"[^\w\s]")
+
+    # Host classification for user input (one C-level scan each)
+    _YOUTUBE_HOST_RE = re.compile(r"youtube\.com|youtu\.be", re.IGNORECASE)
+    _SPOTIFY_HOST_RE = re.compile(r"spotify\.com", re.IGNORECASE)
+    _SPOTIFY_TRACK_RE = re.compile(r"spotify\.com/(?:.*/)?track/", re.IGNORECASE)
+
+    # URL source / playlist detection, one search per call. The source
+    # groups map 1:1 onto _URL_SOURCES (leftmost host wins).
+    _URL_SOURCE_RE = re.compile(
+        r"(spotify\.com)|(music\.youtube\.com)|(youtube\.com|youtu\.be)",
+        re.IGNORECASE,
+    )
+    _URL_SOURCES = (None, "spotify", "youtube_music", "youtube")
+    # "list" query parameter (playlist id) without parsing the whole query
+    _LIST_ID_RE = re.compile(r"[?&]list=([^&#]+)")
+    _PLAYLIST_URL_RE = re.compile(
+        r"youtube\.com/playlist\?list="
+        r"|youtube\.com/watch\?.*list="
+        r"|youtu\.be/.*[?&]list="
+        r"|spotify\.com/(?:.*/)?(?:playlist|album)/",
+        re.IGNORECASE,
+    )
+
+    # YouTube video IDs, embedded in a URL or given bare
+    _YT_VIDEO_ID_RE = re.compile(
+        r"(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/"
+        r"|youtube\.com/v/|music\.youtube\.com/watch\?v=)"
+        r"([a-zA-Z0-9_-]{11})"
+    )
+    _BARE_VIDEO_ID_RE = re.compile(r"[a-zA-Z0-9_-]{11}")
+
+    # Format selector (and bitrate for audio) per quality preset.
+    _AUDIO_QUALITY: dict[str, tuple[str, str]] = {
+        "min": ("worstaudio[abr<=96]/worstaudio/worst", "64"),
+        "avg": (
+            "bestaudio[abr<=160]/bestaudio[abr<=192]/bestaudio/best",
+            "128",
+        ),
+        "max": ("bestaudio/best", "320"),
+    }
+    # Prefer audio formats compatible with MP4 (e.g. m4a/AAC) when the
+    # requested container is mp4; otherwise allow broader selection
+    # (webm/opus etc.). This avoids producing MP4 files with Opus audio
+    # which some players (Windows) cannot play.
+    _VIDEO_QUALITY_MP4: dict[str, str] = {
+        "min": "worstvideo[ext=mp4]+worstaudio[ext=m4a]/worst[ext=mp4]/worst",
+        "avg": "bestvideo[height<=1080]+bestaudio[ext=m4a]/bestaudio[height<=1080]/best[height<=1080]",
+        "max": "bestvideo+bestaudio[ext=m4a]/bestaudio/best",
+    }
+    _VIDEO_QUALITY: dict[str, str] = {
+        "min": "worstvideo[ext=mp4]+worstaudio[ext=m4a]/worst[ext=mp4]/worst",
+        "avg": "bestvideo[height<=1080]+bestaudio/best[height<=1080]",
+        "max": "bestvideo+bestaudio/best",
     }
 
-    _SIDECAR_EXTENSIONS = (".jpg", ".png", ".webp", ".vtt", ".srt", ".ass")
-
-    _VIDEO_TAG_PATTERNS: list[str] = [
-        r"\(Official\s*(Music\s*)?Video\)",
-        r"\(Official\s*Audio\)",
-        r"\(Official\s*Lyric\s*Video\)",
-        r"\(Video\s*Oficial\)",
-        r"\(Audio\s*Oficial\)",
-        r"\(Visualizer\)",
-        r"\[Official\s*(Music\s*)?Video\]",
-        r"\[Official\s*Audio\]",
-        r"\(HD\)",
-        r"\(HQ\)",
-        r"\(4K\)",
-        r"\(1080p\)",
-        r"\(720p\)",
-    ]
+    # Stream preference per target container.  Picking streams whose codecs
+    # the container already accepts lets yt-dlp merge them with a plain
+    # stream copy instead of falling back to another container.
+    _VIDEO_FORMAT_SORT: dict[str, list[str]] = {
+        "mp4": ["vext:mp4", "aext:m4a", "aext:mp3"],
+        "mov": ["vext:mp4", "aext:m4a", "aext:mp3"],
+        "mkv": ["vext:mp4", "aext:m4a", "aext:mp3"],
+        "webm": ["vext:webm", "aext:webm"],
+    }
+
+    # Containers a stream-copy remux can target whatever the source codecs.
+    _REMUX_ANY_CODEC = frozenset({"mp4", "mkv", "mov"})
+
+    # Minimum seconds between "downloading" progress writes per item.
+    _PROGRESS_HOOK_INTERVAL: float = 0.1
 
-    _DEFAULT_MAX_WORKERS: int = 4
+    # Concurrent downloads per request (yt-dlp + ffmpeg are I/O-bound).
+    _DEFAULT_MAX_WORKERS: int = max(1, int(os.getenv("MAX_DOWNLOAD_WORKERS", "4")))
 
     # ------------------------------------------------------------------
     # Initialization
@@ -473,23 +730,48 @@ class OfflinerCore:
 
     def __init__(self) -> None:
         self._base_dir: Path = Path(__file__).resolve().parent
+        downloads = self._base_dir / "Downloads"
+        self._temp_dir: Path = downloads / "Temp"
+        self._zip_dir: Path = downloads / "Zip"
+        self._output_dir: Path = downloads / "Output"
 
         # One-time ffmpeg check at startup
-        self._ffmpeg_available: bool = shutil.which("ffmpeg") is not None
+        self._ffmpeg_available: bool = _FFMPEG_LOCATION is not None
         if not self._ffmpeg_available:
             logger.warning("ffmpeg not found in PATH; post-processing will fail")
 
-        # API clients (graceful init — never raise)
-        self.ytmusic: YTMusic | None = self._init_ytmusic()
+        # API clients (graceful, lazy init — never raise)
         self._spotify_client_id: str = os.getenv("SPOTIFY_CLIENT_ID", "")
         self._spotify_client_secret: str = os.getenv("SPOTIFY_CLIENT_SECRET", "")
-        self._spotify_default: spotipy.Spotify | None = self._init_spotify(
-            self._spotify_client_id, self._spotify_client_secret
-        )
+        self._client_lock = threading.Lock()
+        self._ytmusic: YTMusic | None | object = _UNSET
+        self._spotify: spotipy.Spotify | None | object = _UNSET
+
+    @property
+    def ytmusic(self) -> YTMusic | None:
+        """YTMusic client, created on first access (``None`` if unavailable)."""
+        if self._ytmusic is _UNSET:
+            with self._client_lock:
+                if self._ytmusic is _UNSET:
+                    self._ytmusic = self._init_ytmusic()
+        return self._ytmusic  # type: ignore[return-value]
+
+    @property
+    def _spotify_default(self) -> spotipy.Spotify | None:
+        """Default Spotify client from env credentials, created on first access."""
+        if self._spotify is _UNSET:
+            with self._client_lock:
+                if self._spotify is _UNSET:
+                    self._spotify = self._init_spotify(
+                        self._spotify_client_id, self._spotify_client_secret
+                    )
+        return self._spotify  # type: ignore[return-value]
 
     @staticmethod
     def _init_ytmusic() -> YTMusic | None:
         try:
+            from ytmusicapi import YTMusic
+
             client = YTMusic()
             logger.info("YTMusic client initialized")
             return client
@@ -503,10 +785,9 @@ class OfflinerCore:
             logger.warning("Spotify credentials not configured")
             return None
         try:
-            ccm = SpotifyClientCredentials(client_id, client_secret)
-            client = spotipy.Spotify(
-                client_credentials_manager=ccm, requests_timeout=10
-            )
+            # Shares the per-credential cache with custom clients, so a
+            # config that repeats the env credentials reuses this instance.
+            client = OfflinerCore._spotify_client_for(client_id, client_secret)
             logger.info("Spotify client initialized successfully")
             return client
         except Exception as e:
@@ -517,13 +798,18 @@ class OfflinerCore:
     # Fuzzy matching  (rapidfuzz preferred, SequenceMatcher fallback)
     # ------------------------------------------------------------------
 
-    @staticmethod
-    def _normalize_text(text: str) -> str:
+    @classmethod
+    def _normalize_text(cls, text: str) -> str:
         """Lower-case, strip parenthetical/bracket tags, collapse whitespace."""
         text = text.lower()
-        text = re.sub(r"\([^)]*\)|\[[^\]]*\]", "", text)
-        text = re.sub(r"[^\w\s]", " ", text)
-        return re.sub(r"\s+", " ", text).strip()
+        text = cls._BRACKETED_RE.sub("", text)
+        text = cls._NON_WORD_RE.sub(" ", text)
+        return _norm_ws(text)
+
+    @staticmethod
+    def _search_cache_key(text: str | None) -> str:
+        """Case- and whitespace-insensitive key for search result caches."""
+        return " ".join((text or "").lower().split())
 
     def _is_match(self, query: str, candidate: str, threshold: float = 0.6) -> bool:
         """Return *True* when *query* and *candidate* are sufficiently similar."""
@@ -531,11 +817,25 @@ class OfflinerCore:
 
     def _match_score(self, query: str, candidate: str) -> float:
         """Return a similarity ratio in [0, 1]."""
-        q = self._normalize_text(query)
-        c = self._normalize_text(candidate)
+        return self._normalized_score(
+            self._normalize_text(query), self._normalize_text(candidate)
+        )
+
+    @staticmethod
+    def _normalized_score(q: str, c: str, score_cutoff: float = 0.0) -> float:
+        """Similarity ratio for two strings already passed through ``_normalize_text``.
+
+        Scores below *score_cutoff* are reported as ``0.0``, which lets both
+        backends bail out before computing the full ratio.
+        """
         if _RAPIDFUZZ_AVAILABLE:
-            return _rfuzz.ratio(q, c) / 100.0
-        return _SequenceMatcher(None, q, c).ratio()
+            return _rfuzz.ratio(q, c, score_cutoff=score_cutoff * 100.0) / 100.0
+        sm = _SequenceMatcher(None, q, c)
+        # Cheap upper bounds first; ratio() is the expensive part.
+        if sm.real_quick_ratio() < score_cutoff or sm.quick_ratio() < score_cutoff:
+            return 0.0
+        score = sm.ratio()
+        return score if score >= score_cutoff else 0.0
 
     # ------------------------------------------------------------------
     # Per-session cookie management
@@ -597,22 +897,25 @@ class OfflinerCore:
         p.mkdir(parents=True, exist_ok=True)
         return p
 
-    @staticmethod
-    def _sanitize_filename(title: str) -> str:
+    @classmethod
+    def _sanitize_filename(cls, title: str) -> str:
         """Remove illegal Windows characters and normalize to ASCII."""
         name = title.strip()
-        name = re.sub(r'[<>:"/\\|?*]', "", name)
-        name = re.sub(r"\.+$", "", name.strip())
-        name = re.sub(r"\s+", " ", name).strip()
+        name = name.translate(cls._INVALID_FILENAME_TABLE)
+        name = name.strip().rstrip(".")
+        name = _norm_ws(name)
         if len(name) > 200:
             name = name[:200].strip()
+        if name.isascii():
+            # NFKD + ASCII encode would return it unchanged
+            return name
         try:
             ascii_name = (
                 unicodedata.normalize("NFKD", name)
                 .encode("ascii", "ignore")
                 .decode("ascii")
             )
-            ascii_name = re.sub(r"\s+", " ", ascii_name).strip()
+            ascii_name = _norm_ws(ascii_name)
             if ascii_name:
                 name = ascii_name
         except Exception:
@@ -623,6 +926,55 @@ class OfflinerCore:
     # yt-dlp option builders
     # ------------------------------------------------------------------
 
+    # Static part of the base yt-dlp options, built once at import.  Nested
+    # values are shared between calls — treat them as read-only.
+    _BASE_YTDLP_OPTS: dict[str, Any] = {
+        "quiet": True,
+        "no_warnings": True,
+        "extractor_retries": 10,
+        "fragment_retries": 10,
+        "file_access_retries": 5,
+        "retry_sleep_functions": {"http": lambda n: min(2**n, 30)},
+        "socket_timeout": 60,
+        "http_chunk_size": 10485760,
+        # Start the read/write block at 64 KiB instead of 1 KiB so large
+        # media spends fewer syscalls before the buffer auto-resizes.
+        "buffersize": 65536,
+        "http_headers": {
+            "User-Agent": (
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/120.0.0.0 Safari/537.36"
+            ),
+            "Accept-Language": "en-US,en;q=0.9",
+        },
+        "nocheckcertificate": True,
+        "check_formats": "selected",
+        "force_ipv4": True,
+        "continuedl": False,
+        "overwrites": True,
+        "cachedir": False,
+        "encoding": "utf-8",
+    }
+    if _FFMPEG_LOCATION:
+        _BASE_YTDLP_OPTS["ffmpeg_location"] = _FFMPEG_LOCATION
+
+    # Use the web client when user cookies are present so yt-dlp sends
+    # them to the same surface that issued the cookies. Android client
+    # plus web cookies can trigger 400 responses from YouTube.
+    _EXTRACTOR_ARGS_COOKIES: dict[str, Any] = {"youtube": {"player_client": ["web"]}}
+    _EXTRACTOR_ARGS_DEFAULT: dict[str, Any] = {
+        "youtube": {"player_client": ["android_music"]}
+    }
+    # Metadata-only probes never pick a format, so skip requesting and
+    # parsing the DASH/HLS manifests (extra round-trips per video).
+    _PROBE_EXTRACTOR_ARGS: dict[str, Any] = {
+        "youtube": {"player_client": ["android_music"], "skip": ["dash", "hls"]}
+    }
+    _PROBE_EXTRACTOR_ARGS_COOKIES: dict[str, Any] = {
+        "youtube": {"skip": ["dash", "hls"]}
+    }
+
     @staticmethod
     def _base_ytdlp_opts(cookie_file: Path | None = None) -> dict[str, Any]:
         """Base options shared by every yt-dlp invocation.
@@ -630,39 +982,12 @@ class OfflinerCore:
         When *cookie_file* is provided, ``cookiefile`` is added to the dict
         so yt-dlp authenticates with those cookies.
         """
-        opts: dict[str, Any] = {
-            "quiet": True,
-            "no_warnings": True,
-            "extractor_retries": 10,
-            "fragment_retries": 10,
-            "file_access_retries": 5,
-            "retry_sleep_functions": {"http": lambda n: min(2**n, 30)},
-            "socket_timeout": 60,
-            "http_chunk_size": 10485760,
-            # Use the web client when user cookies are present so yt-dlp sends
-            # them to the same surface that issued the cookies. Android client
-            # plus web cookies can trigger 400 responses from YouTube.
-            "extractor_args": {
-                "youtube": {
-                    "player_client": ["web"] if cookie_file else ["android_music"]
-                },
-            },
-            "http_headers": {
-                "User-Agent": (
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/120.0.0.0 Safari/537.36"
-                ),
-                "Accept-Language": "en-US,en;q=0.9",
-            },
-            "nocheckcertificate": True,
-            "check_formats": "selected",
-            "force_ipv4": True,
-            "continuedl": False,
-            "overwrites": True,
-            "cachedir": False,
-            "encoding": "utf-8",
-        }
+        opts: dict[str, Any] = dict(OfflinerCore._BASE_YTDLP_OPTS)
+        opts["extractor_args"] = (
+            OfflinerCore._EXTRACTOR_ARGS_COOKIES
+            if cookie_file
+            else OfflinerCore._EXTRACTOR_ARGS_DEFAULT
+        )
 
         # Proxy configuration via the global rotating proxy manager.
         proxy = _proxy_rotator.current
@@ -673,33 +998,36 @@ class OfflinerCore:
             opts["cookiefile"] = str(cookie_file)
         return opts
 
-    def _sponsorblock_postprocessors(self, config: dict) -> list[dict]:
+    def _sponsorblock_postprocessors(self, config: dict) -> tuple[dict, ...]:
         """Build SponsorBlock postprocessor chain from user config."""
         if not config.get("SponsorBlock_enabled"):
-            return []
+            return ()
         categories = config.get("SponsorBlock_categories", [])
         if not categories:
-            return []
+            return ()
+        return self._sponsorblock_pp_chain(tuple(sorted(categories)))
 
+    @staticmethod
+    @functools.lru_cache(maxsize=4)
+    def _sponsorblock_pp_chain(categories: tuple[str, ...]) -> tuple[dict, ...]:
+        """Memoised chain for one category selection (shared — do not mutate)."""
         # SponsorBlockPP expects only `categories` and optional `api`.
         # The previous code passed an `action` argument (e.g. 'remove'/'chapter')
         # which is not accepted and caused failures. We instead always request
         # SponsorBlock chapters for the relevant categories and then use
         # `ModifyChapters` to remove the selected categories when needed.
-        all_cats = list(self.SPONSORBLOCK_CATEGORIES.keys())
-
-        pp: list[dict] = [
+        pp: tuple[dict, ...] = (
             {
                 "key": "SponsorBlock",
                 "api": "https://sponsor.ajay.app",
-                "categories": all_cats,
+                "categories": OfflinerCore._SPONSORBLOCK_CATEGORY_KEYS,
             },
             {
                 "key": "ModifyChapters",
                 "remove_sponsor_segments": categories,
                 "force_keyframes": False,
             },
-        ]
+        )
         logger.info(f"SponsorBlock enabled. Removing: {', '.join(categories)}")
         return pp
 
@@ -707,57 +1035,30 @@ class OfflinerCore:
     # URL detection  (static — no instance state needed)
     # ------------------------------------------------------------------
 
-    @staticmethod
-    def detect_url_source(url: str) -> str | None:
+    @classmethod
+    def detect_url_source(cls, url: str) -> str | None:
         """Return ``'spotify'``, ``'youtube_music'``, ``'youtube'``, or *None*."""
         if not url:
             return None
-        u = url.lower()
-        if "spotify.com" in u:
-            return "spotify"
-        if "music.youtube.com" in u:
-            return "youtube_music"
-        if "youtube.com" in u or "youtu.be" in u:
-            return "youtube"
-        return None
+        m = cls._URL_SOURCE_RE.search(url)
+        return cls._URL_SOURCES[m.lastindex] if m else None
 
-    @staticmethod
-    def is_playlist_url(url: str) -> bool:
+    @classmethod
+    def is_playlist_url(cls, url: str) -> bool:
         """Detect YouTube / YouTube Music / Spotify playlist or album URLs."""
         if not url:
             return False
-        u = url.lower()
-        patterns = [
-            "youtube.com/playlist?list=",
-            "youtube.com/watch?v=.*&list=",
-            "youtube.com/watch?.*list=",
-            "music.youtube.com/playlist?list=",
-            "music.youtube.com/watch?v=.*&list=",
-            "youtu.be/.*[?&]list=",
-        ]
-        for p in patterns:
-            if p.replace(".*", "") in u or (
-                ".*" in p and all(part in u for part in p.split(".*"))
-            ):
-                return True
-        if "spotify.com" in u and ("/playlist/" in u or "/album/" in u):
-            return True
-        return False
+        return cls._PLAYLIST_URL_RE.search(url) is not None
 
-    @staticmethod
-    def extract_youtube_video_id(url: str) -> str | None:
+    @classmethod
+    def extract_youtube_video_id(cls, url: str) -> str | None:
         """Extract the 11-character YouTube video ID from *url*."""
         if not url:
             return None
-        m = re.search(
-            r"(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/"
-            r"|youtube\.com/v/|music\.youtube\.com/watch\?v=)"
-            r"([a-zA-Z0-9_-]{11})",
-            url,
-        )
+        m = cls._YT_VIDEO_ID_RE.search(url)
         if m:
             return m.group(1)
-        if re.match(r"^[a-zA-Z0-9_-]{11}$", url):
+        if cls._BARE_VIDEO_ID_RE.fullmatch(url):
             return url
         return None
 
@@ -775,9 +1076,11 @@ class OfflinerCore:
             "total_duration_removed": 0,
             "categories_found": [],
         }
-        cats = categories or list(self.SPONSORBLOCK_CATEGORIES.keys())
+        cats = (
+            frozenset(categories) if categories else self._SPONSORBLOCK_CATEGORY_SET
+        )
         try:
-            resp = requests.get(
+            resp = _http_session.get(
                 f"https://sponsor.ajay.app/api/skipSegments?videoID={video_id}",
                 timeout=5,
             )
@@ -787,16 +1090,26 @@ class OfflinerCore:
                 logger.warning(f"SponsorBlock API returned status {resp.status_code}")
                 return empty
 
-            filtered = [s for s in resp.json() if s.get("category") in cats]
+            # Filter, total up and collect categories in a single pass.
+            filtered: list[dict] = []
+            found: dict[str, None] = {}
+            total = 0
+            for s in _json_loads(resp.content):
+                cat = s.get("category")
+                if cat not in cats:
+                    continue
+                filtered.append(s)
+                found[cat] = None
+                start, end = s["segment"][:2]
+                total += end - start
             if not filtered:
                 return empty
 
-            total = sum(s["segment"][1] - s["segment"][0] for s in filtered)
             return {
                 "has_segments": True,
                 "segments": filtered,
                 "total_duration_removed": total,
-                "categories_found": list({s["category"] for s in filtered}),
+                "categories_found": list(found),
             }
         except requests.RequestException as e:
             logger.error(f"SponsorBlock request error: {e}")
@@ -813,16 +1126,30 @@ class OfflinerCore:
         """Return a Spotify client — custom credentials override the default."""
         custom_id = config.get("Client_ID", "")
         custom_secret = config.get("Secret_ID", "")
-        if custom_id and custom_id != self._spotify_client_id:
+        if custom_id and (custom_id, custom_secret) != (
+            self._spotify_client_id,
+            self._spotify_client_secret,
+        ):
             try:
-                ccm = SpotifyClientCredentials(custom_id, custom_secret)
-                return spotipy.Spotify(
-                    client_credentials_manager=ccm, requests_timeout=10
-                )
+                return self._spotify_client_for(custom_id, custom_secret)
             except Exception as e:
                 logger.error(f"Custom Spotify client failed: {e}")
         return self._spotify_default
 
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _spotify_client_for(client_id: str, client_secret: str) -> spotipy.Spotify:
+        """Cached Spotify client per credential pair.
+
+        The credentials manager caches its access token, so reusing the
+        client means one OAuth exchange per pair instead of one per request.
+        """
+        import spotipy
+        from spotipy.oauth2 import SpotifyClientCredentials
+
+        ccm = SpotifyClientCredentials(client_id, client_secret)
+        return spotipy.Spotify(client_credentials_manager=ccm, requests_timeout=10)
+
     def _resolve_spotify_track(self, config: dict, url: str) -> str:
         """Convert a Spotify track URL into a YouTube URL via search."""
         try:
@@ -830,7 +1157,7 @@ class OfflinerCore:
             if not client:
                 logger.error("No Spotify client available")
                 return ""
-            if "spotify.com" not in url or "/track/" not in url:
+            if not self._SPOTIFY_TRACK_RE.search(url):
                 logger.warning(f"Invalid Spotify URL: {url}")
                 return ""
             track_id = url.split("/track/")[1].split("?")[0].split("/")[0]
@@ -852,32 +1179,76 @@ class OfflinerCore:
 
         Results are cached for 10 minutes to save API quota.
         """
-        cached = _yt_search_cache.get(query)
+        cache_key = self._search_cache_key(query)
+        cached = _yt_search_cache.get(cache_key)
         if cached is not _CACHE_MISS:
             logger.info(f"YouTube search cache hit: '{query}'")
             return cached
 
         result = self._search_youtube_impl(query)
-        _yt_search_cache.put(query, result)
+        _yt_search_cache.put(cache_key, result)
         return result
 
+    def _thread_ydl(self, kind: str, **overrides: Any) -> yt_dlp.YoutubeDL:
+        """This thread's cookie-less YoutubeDL for *kind*.
+
+        Building a YoutubeDL (extractor registry, option parsing) costs far
+        more than a flat extraction, so one instance per thread and purpose
+        is kept and rebuilt only when the proxy rotates or *overrides* change.
+        """
+        instances = _ydl_local.__dict__.setdefault("instances", {})
+        sig = (_proxy_rotator.current, tuple(sorted(overrides.items())))
+        cached = instances.get(kind)
+        if cached is None or cached[0] != sig:
+            if cached is not None:
+                cached[1].close()
+            opts = self._base_ytdlp_opts()
+            opts.update(overrides)
+            cached = (sig, yt_dlp.YoutubeDL(opts))
+            instances[kind] = cached
+        return cached[1]
+
+    def _probe_ydl(self, kind: str, cookie_file: Path | None, **overrides: Any):
+        """Context manager yielding a YoutubeDL for a metadata probe.
+
+        Without cookies the thread's cached instance is reused.  With cookies
+        a fresh one is built (the jar belongs to the session) without forced
+        extractor_args: for authenticated probes yt-dlp should auto-select the
+        client surface, as forcing one can return 400/sign-in errors.
+        """
+        if cookie_file is None:
+            return contextlib.nullcontext(self._thread_ydl(kind, **overrides))
+        opts = self._base_ytdlp_opts(cookie_file)
+        opts.pop("extractor_args", None)
+        opts.update(overrides)
+        return yt_dlp.YoutubeDL(opts)
+
+    def _search_ydl(self) -> yt_dlp.YoutubeDL:
+        """This thread's flat-search YoutubeDL, rebuilt when the proxy rotates."""
+        return self._thread_ydl(
+            "search", extract_flat=True, default_search="ytsearch1"
+        )
+
+    def search_youtube_results(self, query: str, limit: int = 5) -> dict:
+        """Flat ``ytsearch`` of the first *limit* results (this thread's YoutubeDL)."""
+        ydl = self._thread_ydl("search_results", extract_flat=True, noplaylist=True)
+        return ydl.extract_info(f"ytsearch{limit}:{query}", download=False)
+
     def _search_youtube_impl(self, query: str) -> str:
         """Actual YouTube search via yt-dlp (uncached), with proxy rotation."""
         max_attempts = max(_proxy_rotator.count, 1)
         for attempt in range(max_attempts):
             try:
                 logger.info(f"Searching YouTube: {query}")
-                opts = self._base_ytdlp_opts()
-                opts.update({"extract_flat": True, "default_search": "ytsearch1"})
-                with yt_dlp.YoutubeDL(opts) as ydl:
-                    info = ydl.extract_info(f"ytsearch1:{query}", download=False)
-                    if info and info.get("entries"):
-                        entry = info["entries"][0]
-                        vid = (entry.get("id") or "") if entry else ""
-                        if vid:
-                            link = f"https://www.youtube.com/watch?v={vid}"
-                            logger.info(f"Video found: {link}")
-                            return link
+                ydl = self._search_ydl()
+                info = ydl.extract_info(f"ytsearch1:{query}", download=False)
+                if info and info.get("entries"):
+                    entry = info["entries"][0]
+                    vid = (entry.get("id") or "") if entry else ""
+                    if vid:
+                        link = _YT_WATCH_PREFIX + vid
+                        logger.info(f"Video found: {link}")
+                        return link
                 logger.warning(f"No results for: {query}")
                 return ""
             except Exception as e:
@@ -898,7 +1269,7 @@ class OfflinerCore:
 
         Results are cached for 10 minutes.
         """
-        cache_key = (title.strip().lower(), (artist or "").strip().lower())
+        cache_key = (self._search_cache_key(title), self._search_cache_key(artist))
         cached = _ytm_search_cache.get(cache_key)
         if cached is not _CACHE_MISS:
             logger.info(f"YouTube Music cache hit: '{title}'")
@@ -918,10 +1289,9 @@ class OfflinerCore:
 
         try:
             search_q = title.strip()
-            for pat in self._VIDEO_TAG_PATTERNS:
-                search_q = re.sub(pat, "", search_q, flags=re.IGNORECASE)
-            search_q = search_q.replace("||", " ").replace("|", " ").replace("#", " ")
-            search_q = re.sub(r"\s+", " ", search_q).strip()
+            search_q = self._VIDEO_TAG_RE.sub("", search_q)
+            search_q = search_q.translate(self._QUERY_SEPARATORS_TABLE)
+            search_q = _norm_ws(search_q)
 
             logger.info(f"Searching on YouTube Music: '{search_q}'")
 
@@ -932,10 +1302,12 @@ class OfflinerCore:
                 logger.warning(f"No results found for '{search_q}'")
                 return None, None, None
 
-            # Build a combined query string for fuzzy comparison
-            query_combined = f"{title} {artist or ''}".strip()
+            # Build and normalise the combined query once — it is the same
+            # for every candidate scored below.
+            query_norm = self._normalize_text(f"{title} {artist or ''}".strip())
             best: dict | None = None
             best_score: float = 0.0
+            min_score = 0.5
 
             for r in results:
                 if not r.get("videoId"):
@@ -944,17 +1316,25 @@ class OfflinerCore:
                 r_artists = r.get("artists", [])
                 r_artist = r_artists[0].get("name", "") if r_artists else ""
                 result_combined = f"{r_title} {r_artist}".strip()
-                score = self._match_score(query_combined, result_combined)
+                # Candidates that can neither pass the threshold nor beat
+                # the current best are cut off early by the scorer.
+                score = self._normalized_score(
+                    query_norm,
+                    self._normalize_text(result_combined),
+                    score_cutoff=max(best_score, min_score),
+                )
                 if score > best_score:
                     best_score = score
                     best = r
+                    if score >= 1.0:
+                        break
 
-            if best and best_score >= 0.5:
+            if best and best_score >= min_score:
                 vid = best["videoId"]
                 t = best.get("title", search_q)
                 arts = best.get("artists", [])
                 a = arts[0].get("name", "Unknown") if arts else "Unknown"
-                url = f"https://music.youtube.com/watch?v={vid}"
+                url = _YTM_WATCH_PREFIX + vid
                 logger.info(f"Match found ({best_score:.0%}): '{t}' by '{a}'")
                 return url, t, a
 
@@ -970,61 +1350,102 @@ class OfflinerCore:
     # Media info
     # ------------------------------------------------------------------
 
-    def get_media_info(self, url: str, config: dict | None = None) -> dict | None:
-        """Return basic info (title, thumbnail, author, duration) for a single item."""
+    def get_media_info(
+        self, url: str, config: dict | None = None, source: str | None = None
+    ) -> dict | None:
+        """Return basic info (title, thumbnail, author, duration) for a single item.
+
+        *source* may be passed when the caller already ran
+        :meth:`detect_url_source` on *url*.  Successful lookups are cached
+        for 10 minutes, keyed by the URL and the configured cookie source;
+        failures are not cached.
+        """
         if not url:
             return None
+        cookie_source = (
+            (config.get("cookies_content"), config.get("cookies_filepath"))
+            if config
+            else (None, None)
+        )
+        cache_key = (url, hash(cookie_source) if any(cookie_source) else None)
+        cached = _media_info_cache.get(cache_key)
+        if cached is not _CACHE_MISS:
+            logger.info(f"Media info cache hit: '{url}'")
+            # Callers may mutate the result; the cached entry must not change
+            return copy.deepcopy(cached)
+
         probe_dir: Path | None = None
         cookie_file: Path | None = None
         try:
-            if config:
-                probe_dir = Path(tempfile.mkdtemp(prefix="offliner-probe-"))
-                cookie_file = self._setup_cookies(config, probe_dir)
-
-            source = self.detect_url_source(url)
+            if source is None:
+                source = self.detect_url_source(url)
             if source == "spotify":
-                return self._get_spotify_info(url)
-            return self._get_youtube_info(url, source or "youtube", cookie_file)
+                # Cookies only matter for yt-dlp; no probe dir needed
+                info = self._get_spotify_info(url)
+            else:
+                if config:
+                    probe_dir = Path(tempfile.mkdtemp(prefix="offliner-probe-"))
+                    cookie_file = self._setup_cookies(config, probe_dir)
+                info = self._get_youtube_info(url, source or "youtube", cookie_file)
+            if info:
+                _media_info_cache.put(cache_key, copy.deepcopy(info))
+            return info
         except Exception as e:
             logger.error(f"Error getting media info: {e}")
             return None
         finally:
-            if probe_dir and probe_dir.exists():
+            if probe_dir:
                 shutil.rmtree(probe_dir, ignore_errors=True)
 
+    @staticmethod
+    def _thumbnail_rank(t: dict) -> tuple:
+        """Sort key matching yt-dlp's own thumbnail ordering (best last)."""
+        pref = t.get("preference")
+        return (
+            pref if pref is not None else -1,
+            t.get("width") or -1,
+            t.get("height") or -1,
+        )
+
     def _get_youtube_info(
         self, url: str, source: str = "youtube", cookie_file: Path | None = None
     ) -> dict | None:
         max_attempts = max(_proxy_rotator.count, 1)
         for attempt in range(max_attempts):
             try:
-                opts = self._base_ytdlp_opts(cookie_file)
-                if cookie_file:
-                    # For metadata probes with authenticated cookies, let yt-dlp
-                    # auto-select the client surface; forcing a specific client can
-                    # return 400/sign-in errors in some accounts.
-                    opts.pop("extractor_args", None)
-                opts.update(
-                    {
-                        "extract_flat": False,
-                        "skip_download": True,
-                        # Probing metadata should not fail just because a selected
-                        # format is unavailable for the current auth context.
-                        "check_formats": None,
-                    }
-                )
-                with yt_dlp.YoutubeDL(opts) as ydl:
-                    info = ydl.extract_info(url, download=False)
+                # Probing metadata should not fail just because a selected
+                # format is unavailable for the current auth context.
+                with self._probe_ydl(
+                    "info",
+                    cookie_file,
+                    extract_flat=False,
+                    skip_download=True,
+                    check_formats=None,
+                    extractor_args=(
+                        self._PROBE_EXTRACTOR_ARGS_COOKIES
+                        if cookie_file
+                        else self._PROBE_EXTRACTOR_ARGS
+                    ),
+                ) as ydl:
+                    # Unprocessed: with DASH/HLS manifests skipped a live or
+                    # HLS-only video has no formats, and format selection
+                    # would raise although the metadata is all there.
+                    info = ydl.extract_info(url, download=False, process=False)
+                    if info and info.get("_type") in ("url", "url_transparent"):
+                        info = ydl.extract_info(
+                            info["url"], download=False, process=False
+                        )
                     if not info:
                         return None
                     dur_s = info.get("duration", 0) or 0
-                    dur_str = f"{dur_s // 60}:{dur_s % 60:02d}" if dur_s else "0:00"
-                    thumb = ""
-                    for t in reversed(info.get("thumbnails", [])):
-                        if t.get("url"):
-                            thumb = t["url"]
-                            break
-                    thumb = thumb or info.get("thumbnail", "")
+                    dur_str = self._format_duration(int(dur_s)) if dur_s else "0:00"
+                    # Raw thumbnails are unsorted; pick the one yt-dlp would rank last
+                    best = max(
+                        (t for t in info.get("thumbnails") or () if t.get("url")),
+                        key=self._thumbnail_rank,
+                        default=None,
+                    )
+                    thumb = (best or {}).get("url") or info.get("thumbnail", "")
                     return {
                         "titulo": info.get("title", "Sin título"),
                         "thumbnail": thumb,
@@ -1071,7 +1492,7 @@ class OfflinerCore:
                     "titulo": track.get("name", "Sin título"),
                     "thumbnail": imgs[0]["url"] if imgs else "",
                     "autor": artists,
-                    "duracion": f"{dur_s // 60}:{dur_s % 60:02d}",
+                    "duracion": self._format_duration(dur_s),
                     "duracion_segundos": dur_s,
                     "fuente": "spotify",
                 }
@@ -1116,22 +1537,23 @@ class OfflinerCore:
         probe_dir: Path | None = None
         cookie_file: Path | None = None
         try:
-            if config:
-                probe_dir = Path(tempfile.mkdtemp(prefix="offliner-probe-"))
-                cookie_file = self._setup_cookies(config, probe_dir)
-
-            if "spotify.com" in url:
+            # Classify once; everything below branches on this.
+            source = self.detect_url_source(url)
+            if source == "spotify":
                 if "/playlist/" in url:
                     return self._spotify_playlist_info(url, max_items=max_items)
                 if "/album/" in url:
                     return self._spotify_album_info(url, max_items=max_items)
 
-            is_ytm = "music.youtube.com" in url
-            playlist_id: str | None = None
-            if "list=" in url:
-                parsed = urllib.parse.urlparse(url)
-                params = urllib.parse.parse_qs(parsed.query)
-                playlist_id = params.get("list", [None])[0]
+            # Cookies only matter for yt-dlp, so Spotify returns above
+            # without provisioning a probe dir.
+            if config:
+                probe_dir = Path(tempfile.mkdtemp(prefix="offliner-probe-"))
+                cookie_file = self._setup_cookies(config, probe_dir)
+
+            is_ytm = source == "youtube_music"
+            m = self._LIST_ID_RE.search(url)
+            playlist_id = m.group(1) if m else None
 
             if is_ytm and self.ytmusic and playlist_id:
                 result = self._ytmusic_playlist_info(playlist_id, max_items=max_items)
@@ -1150,7 +1572,7 @@ class OfflinerCore:
             logger.error(f"Error getting playlist info: {e}")
             return None
         finally:
-            if probe_dir and probe_dir.exists():
+            if probe_dir:
                 shutil.rmtree(probe_dir, ignore_errors=True)
 
     # --- Spotify playlist / album info ----------------------------------------
@@ -1184,27 +1606,21 @@ class OfflinerCore:
                 "items": [],
             }
 
-            offset, limit = 0, 100
-            while True:
-                page = client.playlist_tracks(
-                    pid,
-                    offset=offset,
-                    limit=limit,
-                    fields="items(track(id,name,artists,duration_ms,album(images))),next,total",
-                )
-                if not page or not page.get("items"):
-                    break
-                for item in page["items"]:
-                    track = item.get("track")
+            # Bind the hot-loop lookups once
+            items = info["items"]
+            append = items.append
+            to_item = self._spotify_track_to_item
+            for page_items in self._iter_playlist_track_pages(
+                client, pid, playlist, max_items
+            ):
+                for item in page_items:
+                    track = item.get("track") if item else None
                     if not track or not track.get("id"):
                         continue
-                    info["items"].append(self._spotify_track_to_item(track))
-                    if max_items and len(info["items"]) > max_items:
-                        info["total"] = len(info["items"])
+                    append(to_item(track))
+                    if max_items and len(items) > max_items:
+                        info["total"] = len(items)
                         return info
-                if not page.get("next"):
-                    break
-                offset += limit
 
             info["total"] = len(info["items"])
             logger.info(
@@ -1250,24 +1666,20 @@ class OfflinerCore:
                 "items": [],
             }
 
-            offset, limit = 0, 50
-            while True:
-                page = client.album_tracks(aid, offset=offset, limit=limit)
-                if not page or not page.get("items"):
-                    break
-                for track in page["items"]:
+            items = info["items"]
+            append = items.append
+            to_item = self._spotify_track_to_item
+            for page_items in self._iter_album_track_pages(client, album):
+                for track in page_items:
                     if not track or not track.get("id"):
                         continue
-                    item = self._spotify_track_to_item(track)
+                    item = to_item(track)
                     # Album tracks don't carry album images; reuse the album thumb
                     item["thumbnail"] = thumb
-                    info["items"].append(item)
-                    if max_items and len(info["items"]) > max_items:
-                        info["total"] = len(info["items"])
+                    append(item)
+                    if max_items and len(items) > max_items:
+                        info["total"] = len(items)
                         return info
-                if not page.get("next"):
-                    break
-                offset += limit
 
             info["total"] = len(info["items"])
             logger.info(
@@ -1279,6 +1691,81 @@ class OfflinerCore:
             logger.error(f"Error getting Spotify album: {e}")
             return None
 
+    @staticmethod
+    def _iter_album_track_pages(client: spotipy.Spotify, album: dict):
+        """Yield lists of album tracks, page by page.
+
+        ``client.album()`` already embeds the first page of tracks, so it is
+        consumed directly and only the following pages hit the API.
+        """
+        page = album.get("tracks")
+        while page and page.get("items"):
+            yield page["items"]
+            if not page.get("next"):
+                break
+            page = client.next(page)
+
+    @staticmethod
+    def _iter_playlist_track_pages(
+        client: spotipy.Spotify,
+        pid: str,
+        playlist: dict,
+        max_items: int | None = None,
+    ):
+        """Yield lists of playlist items, page by page, in playlist order.
+
+        ``client.playlist()`` already embeds the first page and reports the
+        total, so the remaining offsets are known up front and fetched
+        concurrently through a bounded window of in-flight requests.  The
+        window starts just large enough to reach *max_items* and refills one
+        page per page consumed, so a caller that stops early (once it has
+        seen enough valid tracks) leaves at most a few requests to cancel.
+        """
+        first = playlist.get("tracks") or {}
+        items = first.get("items") or []
+        if not items:
+            return
+        yield items
+
+        limit = 100
+        total = first.get("total") or 0
+        offsets = iter(range(len(items), total, limit))
+
+        def _fetch(offset: int) -> list:
+            page = client.playlist_tracks(
+                pid,
+                offset=offset,
+                limit=limit,
+                fields="items(track(id,name,artists,duration_ms,album(images)))",
+            )
+            return (page or {}).get("items") or []
+
+        window_size = 8
+        if max_items:
+            # Pages that could hold max_items + 1 tracks; more are only
+            # requested as the caller keeps consuming (e.g. skipped entries)
+            needed = max_items + 1 - len(items)
+            window_size = max(1, min(window_size, -(-needed // limit)))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=window_size) as pool:
+            window = deque()
+            for offset in offsets:
+                window.append(pool.submit(_fetch, offset))
+                if len(window) >= window_size:
+                    break
+            try:
+                while window:
+                    page_items = window.popleft().result()
+                    offset = next(offsets, None)
+                    if offset is not None:
+                        window.append(pool.submit(_fetch, offset))
+                    if page_items:
+                        yield page_items
+            finally:
+                # Caller stopped early: drop requests that have not started
+                for fut in window:
+                    fut.cancel()
+
     @staticmethod
     def _spotify_track_to_item(track: dict) -> dict:
         """Convert a Spotify track dict into a standard playlist item dict."""
@@ -1290,8 +1777,8 @@ class OfflinerCore:
         return {
             "id": track["id"],
             "titulo": track.get("name", "Sin título"),
-            "url": f"https://open.spotify.com/track/{track['id']}",
-            "duracion": f"{dur_s // 60}:{dur_s % 60:02d}",
+            "url": _SPOTIFY_TRACK_PREFIX + track["id"],
+            "duracion": OfflinerCore._format_duration(dur_s),
             "duracion_segundos": dur_s,
             "thumbnail": album_imgs[0].get("url", "") if album_imgs else "",
             "autor": artists,
@@ -1326,12 +1813,14 @@ class OfflinerCore:
                 "items": [],
             }
 
+            append = info["items"].append
+            parse_duration = self._parse_duration_str
             for t in pl.get("tracks", []):
                 vid = t.get("videoId", "")
                 if not vid:
                     continue
                 dur_txt = t.get("duration", "")
-                dur_s = self._parse_duration_str(dur_txt)
+                dur_s = parse_duration(dur_txt)
                 artists = ", ".join(
                     a.get("name", "") for a in t.get("artists", []) if a.get("name")
                 )
@@ -1339,14 +1828,14 @@ class OfflinerCore:
                 thumb = (
                     thumbs[-1].get("url", "")
                     if thumbs
-                    else f"https://i.ytimg.com/vi/{vid}/mqdefault.jpg"
+                    else _YT_THUMB_PREFIX + vid + "/mqdefault.jpg"
                 )
-                info["items"].append(
+                append(
                     {
                         "id": vid,
                         "video_id": vid,
                         "titulo": t.get("title", "Sin título"),
-                        "url": f"https://www.youtube.com/watch?v={vid}",
+                        "url": _YT_WATCH_PREFIX + vid,
                         "duracion": dur_txt or "--:--",
                         "duracion_segundos": dur_s,
                         "thumbnail": thumb,
@@ -1394,21 +1883,17 @@ class OfflinerCore:
         cookie_file: Path | None = None,
         max_items: int | None = None,
     ) -> dict | None:
-        opts = self._base_ytdlp_opts(cookie_file)
-        if cookie_file:
-            opts.pop("extractor_args", None)
-        opts.update(
-            {
-                "extract_flat": "in_playlist",
-                "skip_download": True,
-                "ignoreerrors": True,
-                "playlistend": (max_items + 1) if max_items else None,
-                "extractor_retries": 3,
-                "socket_timeout": 30,
-                "check_formats": None,
-            }
-        )
-        with yt_dlp.YoutubeDL(opts) as ydl:
+        with self._probe_ydl(
+            "playlist",
+            cookie_file,
+            extract_flat="in_playlist",
+            skip_download=True,
+            ignoreerrors=True,
+            playlistend=(max_items + 1) if max_items else None,
+            extractor_retries=3,
+            socket_timeout=30,
+            check_formats=None,
+        ) as ydl:
             result = ydl.extract_info(url, download=False)
             if not result:
                 return None
@@ -1424,37 +1909,10 @@ class OfflinerCore:
                 "items": [],
             }
 
-            entries = result.get("entries", [])
-            if entries and not isinstance(entries, list):
-                entries = list(entries)
-
-            for entry in entries or []:
-                if entry is None:
-                    continue
-                dur_s = entry.get("duration", 0) or 0
-                dur_str = (
-                    f"{int(dur_s // 60)}:{int(dur_s % 60):02d}" if dur_s else "--:--"
-                )
-                vid = entry.get("id", entry.get("url", ""))
-                if vid and not vid.startswith("http"):
-                    v_url = f"https://www.youtube.com/watch?v={vid}"
-                else:
-                    v_url = entry.get("url", "")
-                thumb = entry.get("thumbnail", "") or (
-                    f"https://i.ytimg.com/vi/{vid}/mqdefault.jpg" if vid else ""
-                )
-                info["items"].append(
-                    {
-                        "id": vid,
-                        "video_id": vid,
-                        "titulo": entry.get("title", "Sin título"),
-                        "url": v_url,
-                        "duracion": dur_str,
-                        "duracion_segundos": dur_s,
-                        "thumbnail": thumb,
-                        "autor": entry.get("uploader", entry.get("channel", "")),
-                    }
-                )
+            # Consume entries as yt-dlp yields them (no intermediate list)
+            info["items"].extend(
+                self._iter_ytdlp_playlist_items(result.get("entries") or ())
+            )
 
             info["total"] = len(info["items"])
             logger.info(
@@ -1462,6 +1920,33 @@ class OfflinerCore:
             )
             return info
 
+    @staticmethod
+    def _iter_ytdlp_playlist_items(entries):
+        """Yield standard playlist item dicts from (flat) yt-dlp entries."""
+        for entry in entries:
+            if entry is None:
+                continue
+            dur_s = entry.get("duration", 0) or 0
+            dur_str = OfflinerCore._format_duration(int(dur_s)) if dur_s else "--:--"
+            vid = entry.get("id", entry.get("url", ""))
+            if vid and not vid.startswith("http"):
+                v_url = _YT_WATCH_PREFIX + vid
+            else:
+                v_url = entry.get("url", "")
+            thumb = entry.get("thumbnail", "") or (
+                _YT_THUMB_PREFIX + vid + "/mqdefault.jpg" if vid else ""
+            )
+            yield {
+                "id": vid,
+                "video_id": vid,
+                "titulo": entry.get("title", "Sin título"),
+                "url": v_url,
+                "duracion": dur_str,
+                "duracion_segundos": dur_s,
+                "thumbnail": thumb,
+                "autor": entry.get("uploader", entry.get("channel", "")),
+            }
+
     # ------------------------------------------------------------------
     # Playlist URL resolution (download-time)
     # ------------------------------------------------------------------
@@ -1478,14 +1963,18 @@ class OfflinerCore:
                 max_proxy_attempts = max(_proxy_rotator.count, 1)
                 for _pa in range(max_proxy_attempts):
                     try:
-                        opts = self._base_ytdlp_opts()
-                        opts.update(
-                            {"extract_flat": True, "force_generic_extractor": True}
+                        ydl = self._thread_ydl(
+                            "flat_playlist",
+                            extract_flat=True,
+                            force_generic_extractor=True,
                         )
-                        with yt_dlp.YoutubeDL(opts) as ydl:
-                            result = ydl.extract_info(url, download=False)
-                            if result and "entries" in result:
-                                urls = [e["url"] for e in result["entries"]]
+                        result = ydl.extract_info(url, download=False)
+                        if result:
+                            urls = [
+                                e["url"]
+                                for e in result.get("entries") or ()
+                                if e and e.get("url")
+                            ]
                         break
                     except Exception as _pe:
                         if (
@@ -1502,12 +1991,24 @@ class OfflinerCore:
                 if not client:
                     logger.error("Spotify client not available")
                     return []
-                tracks = self._collect_spotify_tracks(client, url)
-                if tracks:
-                    queries = [f"{n} {a}" for n, a in tracks]
-                    with concurrent.futures.ThreadPoolExecutor() as pool:
-                        resolved = list(pool.map(self.search_youtube, queries))
-                    urls.extend(u for u in resolved if u)
+                prefer_ytm = bool(config.get("Preferir_YouTube_Music"))
+                resolved: list[str | None] = []
+                # Network-bound: size the pool for latency.  Each track is
+                # submitted as its page arrives, so searches overlap the
+                # remaining pagination; slots are filled by index as they
+                # finish, which keeps playlist order.
+                with concurrent.futures.ThreadPoolExecutor(max_workers=16) as pool:
+                    futures: dict[concurrent.futures.Future, int] = {}
+                    tracks = self._iter_spotify_tracks(client, url)
+                    for i, (name, artist) in enumerate(tracks):
+                        resolved.append(None)
+                        fut = pool.submit(
+                            self._resolve_track_url, name, artist, prefer_ytm
+                        )
+                        futures[fut] = i
+                    for fut in concurrent.futures.as_completed(futures):
+                        resolved[futures[fut]] = fut.result()
+                urls = [u for u in resolved if u]
 
             logger.info(f"Got {len(urls)} video(s) from {platform} playlist")
             return urls
@@ -1515,24 +2016,39 @@ class OfflinerCore:
             logger.error(f"Error getting playlist from {platform}: {e}")
             return []
 
-    @staticmethod
-    def _collect_spotify_tracks(
-        client: spotipy.Spotify, url: str
-    ) -> list[tuple[str, str]]:
-        """Return ``[(track_name, artist_name), ...]`` from a Spotify URL."""
-        tracks: list[tuple[str, str]] = []
+    def _resolve_track_url(self, name: str, artist: str, prefer_ytm: bool) -> str:
+        """YouTube (Music) URL for one Spotify track, or ``""``.
+
+        YouTube Music is tried first only when preferred; plain YouTube
+        search covers the rest (and everything when it is not).
+        """
+        if prefer_ytm:
+            ytm_url, _, _ = self.search_youtube_music(name, artist)
+            if ytm_url:
+                return ytm_url
+        return self.search_youtube(f"{name} {artist}")
 
+    @staticmethod
+    def _iter_spotify_tracks(client: spotipy.Spotify, url: str):
+        """Yield ``(track_name, artist_name)`` from a Spotify URL, page by page."""
         if "/playlist/" in url:
             pid = url.split("/playlist/")[1].split("?")[0].split("/")[0]
             offset = 0
             while True:
-                page = client.playlist_items(pid, offset=offset)
+                # Max page size, and only the fields read below.
+                page = client.playlist_items(
+                    pid,
+                    offset=offset,
+                    limit=100,
+                    fields="items(track(name,artists(name))),total",
+                    additional_types=("track",),
+                )
                 if not page or not page.get("items"):
                     break
                 for item in page["items"]:
                     t = item.get("track")
                     if t and t.get("name") and t.get("artists"):
-                        tracks.append((t["name"], t["artists"][0]["name"]))
+                        yield t["name"], t["artists"][0]["name"]
                 offset += len(page["items"])
                 if offset >= page.get("total", 0):
                     break
@@ -1541,22 +2057,13 @@ class OfflinerCore:
             aid = url.split("/album/")[1].split("?")[0].split("/")[0]
             album = client.album(aid)
             if not album:
-                return tracks
+                return
             fallback = ([a["name"] for a in album.get("artists", [])] or [""])[0]
-            offset = 0
-            while True:
-                page = client.album_tracks(aid, offset=offset, limit=50)
-                if not page or not page.get("items"):
-                    break
-                for t in page["items"]:
+            for page_items in OfflinerCore._iter_album_track_pages(client, album):
+                for t in page_items:
                     if t and t.get("name"):
                         a = t["artists"][0]["name"] if t.get("artists") else fallback
-                        tracks.append((t["name"], a))
-                if not page.get("next"):
-                    break
-                offset += len(page["items"])
-
-        return tracks
+                        yield t["name"], a
 
     # ------------------------------------------------------------------
     # yt-dlp progress hooks (for SSE real-time updates)
@@ -1564,34 +2071,53 @@ class OfflinerCore:
 
     def _make_progress_hook(self, request_id: str) -> Callable:
         """Create a yt-dlp progress_hook that writes to DownloadProgressStore."""
+        # The hook fires many times per second with the same few filenames
+        # (one per format/fragment target), so split each path only once.
+        stems: dict[str, str] = {}
+        min_interval = self._PROGRESS_HOOK_INTERVAL
+        last_emit = 0.0
+
+        def _stem(path: str) -> str:
+            stem = stems.get(path)
+            if stem is None:
+                stem = stems[path] = os.path.splitext(os.path.basename(path))[0]
+            return stem
 
         def hook(d: dict) -> None:
-            # If cancellation has been requested (client disconnected), raise to abort yt-dlp
-            try:
-                if DownloadProgressStore.is_cancelled(request_id):
-                    raise yt_dlp.utils.DownloadError("Cancelled by client disconnect")
-            except Exception:
-                # In case yt_dlp references aren't available yet or other errors,
-                # just raise a generic exception to abort.
-                raise
+            nonlocal last_emit
             status = d.get("status", "")
+            # yt-dlp reports "downloading" many times per second; coalesce
+            # those ticks (each costs several Redis round-trips).  Status
+            # changes such as "finished" always go through.
+            if status == "downloading":
+                now = time.monotonic()
+                if now - last_emit < min_interval:
+                    return
+                last_emit = now
+            # If cancellation has been requested (client disconnected), raise to abort yt-dlp
+            if DownloadProgressStore.is_cancelled(request_id):
+                raise yt_dlp.utils.DownloadError("Cancelled by client disconnect")
             if status == "downloading":
                 downloaded = d.get("downloaded_bytes", 0) or 0
                 total = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
-                item_pct = (downloaded / total * 100) if total > 0 else 0
 
                 store = DownloadProgressStore.get(request_id)
                 completed = store.get("completed_items", 0)
                 total_items = max(store.get("total_items", 1), 1)
 
-                # Map to 15-90% range
-                overall = 15 + ((completed + item_pct / 100) / total_items) * 75
+                # Map to 15-90% range; total_bytes_estimate may be a float
+                if total > 0:
+                    overall = 15 + int(
+                        (completed * total + downloaded) * 75 // (total * total_items)
+                    )
+                else:
+                    overall = 15 + completed * 75 // total_items
 
                 speed = d.get("speed")
                 speed_str = self._format_speed(speed) if speed else ""
                 eta = d.get("eta")
                 eta_str = self._format_eta(eta) if eta else ""
-                filename = Path(d.get("filename", "")).stem
+                filename = _stem(d.get("filename") or "")
 
                 DownloadProgressStore.update(
                     request_id,
@@ -1604,7 +2130,7 @@ class OfflinerCore:
                     phase="downloading",
                 )
             elif status == "finished":
-                filename = Path(d.get("filename", "")).stem
+                filename = _stem(d.get("filename") or "")
                 DownloadProgressStore.update(
                     request_id,
                     status="Converting...",
@@ -1667,6 +2193,61 @@ class OfflinerCore:
     # Unified media download  (DRY merge of audio + video)
     # ------------------------------------------------------------------
 
+    def _preflight_info(self, url: str, cookie_file: Path | None) -> dict | None:
+        """Extract *url*'s info without downloading.
+
+        Returns ``None`` when no playable formats were found.
+        """
+
+        def _extract(opts: dict[str, Any] | None) -> dict:
+            # process=False skips format selection/checking — the download
+            # step does that anyway when it is handed this info.  Anything
+            # other than a plain video (e.g. a redirect) is resolved fully.
+            # Cookie-less probes (opts is None) reuse the thread's instance.
+            ydl_cm = (
+                contextlib.nullcontext(self._thread_ydl("preflight"))
+                if opts is None
+                else yt_dlp.YoutubeDL(opts)
+            )
+            with ydl_cm as ydl:
+                data = ydl.extract_info(url, download=False, process=False)
+                if data and data.get("_type", "video") != "video":
+                    data = ydl.process_ie_result(data, download=False)
+                return data
+
+        used_fallback_opts = False
+        try:
+            info = _extract(self._base_ytdlp_opts(cookie_file) if cookie_file else None)
+        except Exception:
+            if not cookie_file:
+                raise
+            # Retry once without forced extractor_args for cookie-auth flows.
+            fb_opts = self._base_ytdlp_opts(cookie_file)
+            fb_opts.pop("extractor_args", None)
+            info = _extract(fb_opts)
+            used_fallback_opts = True
+
+        def _has_playable_formats(data: dict) -> bool:
+            fmts = data.get("formats", []) or []
+            return any(
+                (f.get("vcodec") and f.get("vcodec") != "none")
+                or (f.get("acodec") and f.get("acodec") != "none")
+                for f in fmts
+            )
+
+        if not _has_playable_formats(info):
+            # Try one fallback without forced player_client in case cookies are valid
+            # but the selected client surface returned only storyboards.
+            # Skipped when *info* already came from those fallback options.
+            if cookie_file and not used_fallback_opts:
+                fb_opts = self._base_ytdlp_opts(cookie_file)
+                fb_opts.pop("extractor_args", None)
+                info = _extract(fb_opts)
+
+            if not _has_playable_formats(info):
+                return None
+        return info
+
     def _download_media(
         self,
         url: str,
@@ -1683,10 +2264,11 @@ class OfflinerCore:
         All files are written strictly inside ``session_dir``.
         """
         is_audio = format_mode == "audio"
+        task_tmp: Path | None = None
 
         try:
             # --- Spotify URL conversion ---
-            if "spotify.com" in url and "/track/" in url:
+            if self._SPOTIFY_TRACK_RE.search(url):
                 logger.info("Detected Spotify URL, converting to YouTube")
                 url = self._resolve_spotify_track(config, url)
                 if not url:
@@ -1699,37 +2281,12 @@ class OfflinerCore:
                     "ffmpeg is not installed or not in PATH; some post-processing may fail."
                 )
 
-            # --- Pre-flight metadata extraction ---
-            try:
-                with yt_dlp.YoutubeDL(self._base_ytdlp_opts(cookie_file)) as ydl:
-                    info = ydl.extract_info(url, download=False)
-            except Exception:
-                if not cookie_file:
-                    raise
-                # Retry once without forced extractor_args for cookie-auth flows.
-                fb_opts = self._base_ytdlp_opts(cookie_file)
-                fb_opts.pop("extractor_args", None)
-                with yt_dlp.YoutubeDL(fb_opts) as ydl:
-                    info = ydl.extract_info(url, download=False)
-
-            def _has_playable_formats(data: dict) -> bool:
-                fmts = data.get("formats", []) or []
-                return any(
-                    (f.get("vcodec") and f.get("vcodec") != "none")
-                    or (f.get("acodec") and f.get("acodec") != "none")
-                    for f in fmts
-                )
-
-            if not _has_playable_formats(info):
-                # Try one fallback without forced player_client in case cookies are valid
-                # but the selected client surface returned only storyboards.
-                if cookie_file:
-                    fb_opts = self._base_ytdlp_opts(cookie_file)
-                    fb_opts.pop("extractor_args", None)
-                    with yt_dlp.YoutubeDL(fb_opts) as ydl:
-                        info = ydl.extract_info(url, download=False)
-
-                if not _has_playable_formats(info):
+            # --- Pre-flight metadata extraction (shared per session) ---
+            # An item queued as both audio and video is probed only once.
+            info = result.get_info(url)
+            if info is None:
+                info = self._preflight_info(url, cookie_file)
+                if info is None:
                     logger.error(
                         "No playable formats were returned (video likely needs valid logged-in cookies)."
                     )
@@ -1742,6 +2299,7 @@ class OfflinerCore:
                             phase="error",
                         )
                     return
+                result.put_info(url, info)
 
             title = info.get("title", "Unknown Title")
             uploader = info.get("uploader", "Unknown Uploader")
@@ -1766,40 +2324,18 @@ class OfflinerCore:
             quality_key = config.get("Calidad_audio_video", "avg")
 
             if is_audio:
-                _AUDIO_QUALITY: dict[str, tuple[str, str]] = {
-                    "min": ("worstaudio[abr<=96]/worstaudio/worst", "64"),
-                    "avg": (
-                        "bestaudio[abr<=160]/bestaudio[abr<=192]/bestaudio/best",
-                        "128",
-                    ),
-                    "max": ("bestaudio/best", "320"),
-                }
-                fmt_str, quality_val = _AUDIO_QUALITY.get(
-                    quality_key, _AUDIO_QUALITY["avg"]
+                fmt_str, quality_val = self._AUDIO_QUALITY.get(
+                    quality_key, self._AUDIO_QUALITY["avg"]
                 )
                 file_format = config.get("Formato_audio", "mp3")
             else:
-                # Prefer audio formats compatible with MP4 (e.g. m4a/AAC)
-                # when the requested container is mp4; otherwise allow
-                # broader selection (webm/opus etc.). This avoids producing
-                # MP4 files with Opus audio which some players (Windows)
-                # cannot play.
                 file_format = config.get("Formato_video", "mp4")
-
-                if file_format == "mp4":
-                    _VIDEO_QUALITY: dict[str, str] = {
-                        "min": "worstvideo[ext=mp4]+worstaudio[ext=m4a]/worst[ext=mp4]/worst",
-                        "avg": "bestvideo[height<=1080]+bestaudio[ext=m4a]/bestaudio[height<=1080]/best[height<=1080]",
-                        "max": "bestvideo+bestaudio[ext=m4a]/bestaudio/best",
-                    }
-                else:
-                    _VIDEO_QUALITY = {
-                        "min": "worstvideo[ext=mp4]+worstaudio[ext=m4a]/worst[ext=mp4]/worst",
-                        "avg": "bestvideo[height<=1080]+bestaudio/best[height<=1080]",
-                        "max": "bestvideo+bestaudio/best",
-                    }
-
-                fmt_str = _VIDEO_QUALITY.get(quality_key, _VIDEO_QUALITY["avg"])
+                video_quality = (
+                    self._VIDEO_QUALITY_MP4
+                    if file_format == "mp4"
+                    else self._VIDEO_QUALITY
+                )
+                fmt_str = video_quality.get(quality_key, video_quality["avg"])
                 quality_val = ""  # unused for video
 
             logger.info(f"Downloading {format_mode}: '{title}'")
@@ -1807,7 +2343,11 @@ class OfflinerCore:
             # --- Output template ---
             # Use yt-dlp template macros so its internal postprocessors
             # manage final filenames and thumbnail embedding.
-            outtmpl = str(out_dir / "%(title)s - %(uploader)s.%(ext)s")
+            outtmpl = "%(title)s - %(uploader)s.%(ext)s"
+            # Intermediate files (.part, unmerged formats, thumbnails) go to a
+            # per-task temp dir so concurrent workers never share temp names;
+            # yt-dlp moves the finished file into out_dir.
+            task_tmp = out_dir / f".tmp-{uuid.uuid4().hex[:12]}"
 
             # --- Postprocessors ---
             postprocessors = list(self._sponsorblock_postprocessors(config))
@@ -1820,6 +2360,16 @@ class OfflinerCore:
                         "preferredquality": quality_val,
                     }
                 )
+            elif file_format in self._REMUX_ANY_CODEC:
+                # merge_output_format only applies when separate streams are
+                # merged; a pre-muxed fallback format can still arrive in
+                # another container.  Remux it (stream copy, no re-encode);
+                # yt-dlp skips this when the extension already matches.
+                # WebM only takes VP8/VP9/AV1 + Vorbis/Opus, so a copied
+                # h264/aac fallback would fail — it is left as delivered.
+                postprocessors.append(
+                    {"key": "FFmpegVideoRemuxer", "preferedformat": file_format}
+                )
 
             # Common: metadata + thumbnail conversion. EmbedThumbnail is only
             # added when the final container/codec supports embedded cover art
@@ -1830,17 +2380,27 @@ class OfflinerCore:
                     "add_chapters": True,
                     "add_metadata": True,
                 },
-                {"key": "FFmpegThumbnailsConvertor", "format": "jpg"},
             ]
 
             # Supported targets for thumbnail embedding (yt-dlp/ffmpeg)
             fmt = (file_format or "").lower()
             if is_audio:
-                embed_supported = fmt in ("mp3", "ogg", "opus", "flac", "m4a")
+                embed_supported = fmt in self._AUDIO_THUMBNAIL_FORMATS
             else:
-                embed_supported = fmt in ("mp4", "m4v", "mov", "mkv", "mka")
+                embed_supported = fmt in self._VIDEO_THUMBNAIL_FORMATS
 
+            # Nothing to embed when the extractor reported no thumbnail (the
+            # pre-flight info only describes *url*, so trust it for that URL).
+            if download_url == url and not (
+                info.get("thumbnails") or info.get("thumbnail")
+            ):
+                embed_supported = False
+
+            # Only fetch/convert the thumbnail when it will be embedded;
+            # otherwise it is just an extra download, an ffmpeg pass and a
+            # sidecar to clean up afterwards.
             if embed_supported:
+                common_pp.append({"key": "FFmpegThumbnailsConvertor", "format": "jpg"})
                 common_pp.append({"key": "EmbedThumbnail"})
 
             postprocessors.extend(common_pp)
@@ -1852,9 +2412,13 @@ class OfflinerCore:
                     "format": fmt_str,
                     "postprocessors": postprocessors,
                     "outtmpl": outtmpl,
+                    "paths": {"home": str(out_dir), "temp": str(task_tmp)},
                     "trim_file_name_length": 184,
                     "updatetime": False,
-                    "writethumbnail": True,
+                    "writethumbnail": embed_supported,
+                    # Fetch fragmented (DASH/HLS) streams in parallel; this
+                    # applies to audio-only formats as well as video.
+                    "concurrent_fragment_downloads": 3,
                     "parse_metadata": [
                         "%(artist,uploader)s:%(artist)s",
                         "%(album,title)s:%(album)s",
@@ -1876,9 +2440,10 @@ class OfflinerCore:
 
             if not is_audio:
                 video_opts: dict = {
-                    "format_sort": ["vext:mp4", "aext:m4a", "aext:mp3"],
+                    "format_sort": self._VIDEO_FORMAT_SORT.get(
+                        fmt, self._VIDEO_FORMAT_SORT["mp4"]
+                    ),
                     "merge_output_format": file_format,
-                    "concurrent_fragment_downloads": 3,
                     "retries": 3,
                 }
                 ydl_opts.update(video_opts)
@@ -1893,16 +2458,21 @@ class OfflinerCore:
                 ]
 
             # --- Download ---
-            try:
+            # When the URL wasn't swapped (e.g. for a YouTube Music match),
+            # hand the pre-flight info straight to yt-dlp instead of
+            # extracting the same page a second time.
+            reuse_info = download_url == url
+
+            def _run_download() -> dict | None:
                 with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    dl_info = ydl.extract_info(download_url, download=True)
+                    if reuse_info:
+                        return ydl.process_ie_result(copy.deepcopy(info), download=True)
+                    return ydl.extract_info(download_url, download=True)
+
+            try:
+                dl_info = _run_download()
             except Exception as e:
-                msg = str(e)
-                if (
-                    "SponsorBlock" in msg
-                    or "SponsorBlockPP" in msg
-                    or "unexpected keyword argument 'action'" in msg
-                ):
+                if self._SPONSORBLOCK_ERROR_RE.search(str(e)):
                     logger.warning(
                         f"SponsorBlock postprocessor failed: {e}. Retrying without SponsorBlock."
                     )
@@ -1920,8 +2490,7 @@ class OfflinerCore:
                     ]
                     ydl_opts["postprocessors"] = filtered_pp
                     try:
-                        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                            dl_info = ydl.extract_info(download_url, download=True)
+                        dl_info = _run_download()
                     except Exception as e2:
                         logger.error(
                             f"Download failed after disabling SponsorBlock: {e2}"
@@ -1954,28 +2523,39 @@ class OfflinerCore:
                             final_path = candidate
                             break
 
-            # 2) Fallback: scan output directory for matching basename
+            # 2) Fallback: check the expected filename with a single stat,
+            #    then scan the output directory for a matching basename
             if final_path is None:
-                candidates = list(out_dir.glob(f"{clean_title}.*"))
-                # Exclude known sidecar extensions
-                candidates = [
-                    p
-                    for p in candidates
-                    if p.suffix.lower() not in self._SIDECAR_EXTENSIONS
-                ]
+                expected = out_dir / f"{clean_title}.{file_format}"
+                if expected.is_file():
+                    final_path = expected
+
+            if final_path is None:
+                # Single directory scan for "<title>.*", excluding known
+                # sidecar extensions
+                prefix = f"{clean_title}."
+                candidates: list[os.DirEntry] = []
+                with os.scandir(out_dir) as it:
+                    for entry in it:
+                        if (
+                            entry.name.startswith(prefix)
+                            and os.path.splitext(entry.name)[1].lower()
+                            not in self._SIDECAR_EXTENSIONS
+                            and entry.is_file()
+                        ):
+                            candidates.append(entry)
                 if is_audio and file_format:
                     # Prefer exact extension match
-                    for p in candidates:
-                        if p.suffix.lower() == f".{file_format}".lower():
-                            final_path = p
+                    wanted = f".{file_format}".lower()
+                    for entry in candidates:
+                        if os.path.splitext(entry.name)[1].lower() == wanted:
+                            final_path = Path(entry.path)
                             break
                 if final_path is None and candidates:
                     # Pick the largest candidate (likely the media file)
-                    candidates.sort(
-                        key=lambda p: p.stat().st_size if p.exists() else 0,
-                        reverse=True,
+                    final_path = Path(
+                        max(candidates, key=lambda e: e.stat().st_size).path
                     )
-                    final_path = candidates[0]
 
             # 3) Last-resort: reconstruct expected path
             if final_path is None:
@@ -1990,8 +2570,7 @@ class OfflinerCore:
                 # Rely on yt-dlp's postprocessors (EmbedThumbnail) to have
                 # embedded the cover art. Clean sidecars and record result.
                 self._cleanup_sidecars(final_path)
-                result.inc_success(format_mode)
-                result.add_file(str(final_path))
+                result.record_success(format_mode, str(final_path))
                 logger.info(f"{format_mode.capitalize()} downloaded: '{title}'")
             else:
                 logger.error(f"Output file not found after download: {final_path}")
@@ -2004,6 +2583,9 @@ class OfflinerCore:
                 raise _ProxyBlockedError(str(e)) from e
             logger.error(f"Error downloading {format_mode}: {e}")
             result.inc_error(format_mode)
+        finally:
+            if task_tmp is not None:
+                shutil.rmtree(task_tmp, ignore_errors=True)
 
     @staticmethod
     def _resolve_video_output(
@@ -2028,23 +2610,26 @@ class OfflinerCore:
         subtitle sidecars produced by yt-dlp (``video.en.srt``,
         ``video.es-orig.vtt``, etc.).
         """
-        stem = filepath.stem
-        parent = filepath.parent
-        for ext in self._SIDECAR_EXTENSIONS:
-            # Plain sidecar: video.srt
-            sidecar = filepath.with_suffix(ext)
-            if sidecar.exists():
-                try:
-                    sidecar.unlink()
-                except OSError:
-                    pass
-            # Language-suffixed sidecars: video.en.srt, video.es-orig.vtt
-            for lang_file in parent.glob(f"{stem}.*{ext}"):
-                if lang_file != filepath:
-                    try:
-                        lang_file.unlink()
-                    except OSError:
-                        pass
+        # One directory scan covers both forms (``stem.ext`` and
+        # ``stem.<lang>.ext``) for every sidecar extension.
+        prefix = f"{filepath.stem}."
+        keep = filepath.name
+        try:
+            with os.scandir(filepath.parent) as it:
+                for entry in it:
+                    name = entry.name
+                    if (
+                        name != keep
+                        and name.startswith(prefix)
+                        and os.path.splitext(name)[1].lower()
+                        in self._SIDECAR_EXTENSIONS
+                    ):
+                        try:
+                            os.unlink(entry.path)
+                        except OSError:
+                            pass
+        except OSError:
+            pass
 
     # ------------------------------------------------------------------
     # Compression
@@ -2057,25 +2642,57 @@ class OfflinerCore:
         output_folder: Path | str | None = None,
     ) -> str | None:
         """Compress *files* into a ZIP, delete originals, return ZIP path."""
+        zip_path: Path | None = None
         try:
-            out = self._ensure_dir(
-                output_folder or self._base_dir / "Downloads" / "Zip"
-            )
+            out = self._ensure_dir(output_folder or self._zip_dir)
             clean_name = self._sanitize_filename(zip_name)
             if clean_name.lower().endswith(".zip"):
                 clean_name = clean_name[:-4]
             zip_path = out / f"{clean_name}.zip"
 
-            with zipfile.ZipFile(zip_path, "w") as zf:
+            # Entries stay STORED: the media is already compressed, so
+            # deflate would burn CPU for almost no size gain.  Each file is
+            # streamed in 1 MiB chunks instead of ZipFile.write's 8 KiB.
+            # Archive names already used, tracked in a set: sanitising can
+            # map distinct files onto one name, and ZipFile would otherwise
+            # write a duplicate entry.
+            used_names: set[str] = set()
+            with zipfile.ZipFile(zip_path, "w", allowZip64=True) as zf:
                 for f in files:
-                    zf.write(f, self._sanitize_filename(Path(f).name))
+                    arcname = self._sanitize_filename(Path(f).name)
+                    if arcname in used_names:
+                        stem, ext = os.path.splitext(arcname)
+                        n = 2
+                        while f"{stem} ({n}){ext}" in used_names:
+                            n += 1
+                        arcname = f"{stem} ({n}){ext}"
+                    used_names.add(arcname)
+                    info = zipfile.ZipInfo.from_file(f, arcname)
+                    info.compress_type = zipfile.ZIP_STORED
+                    # Unbuffered source: copyfileobj already reads in 1 MiB
+                    # blocks, so a BufferedReader would only add a copy.
+                    with open(f, "rb", buffering=0) as src, zf.open(
+                        info, "w", force_zip64=True
+                    ) as dst:
+                        shutil.copyfileobj(src, dst, _ZIP_COPY_CHUNK)
+
+            # Originals go only once the archive is complete, so a failure
+            # part-way through never loses a file that downloaded fine.
             for f in files:
-                Path(f).unlink(missing_ok=True)
+                try:
+                    os.unlink(f)
+                except OSError as e:
+                    logger.warning(f"Could not remove '{f}' after zipping: {e}")
 
             logger.info(f"Files compressed to '{zip_path.name}'")
-            return str(zip_path.resolve())
+            # ``_ensure_dir`` already returns an absolute path.
+            return str(zip_path)
         except Exception as e:
             logger.error(f"Error compressing files: {e}")
+            # Drop the partial archive; the originals are still in place
+            if zip_path is not None:
+                with contextlib.suppress(OSError):
+                    zip_path.unlink()
             return None
 
     # ------------------------------------------------------------------
@@ -2098,12 +2715,24 @@ class OfflinerCore:
         if not tasks:
             return
 
-        result.total_items = max(len(tasks), 1)
-        if result.request_id:
-            DownloadProgressStore.update(
-                result.request_id, total_items=result.total_items
-            )
+        # Playlists often repeat an entry; the copies would download to the
+        # same output name and race each other, so keep only the first.
+        seen: set[tuple[str, str]] = set()
+        unique: list[tuple[str, str, dict]] = []
+        for task in tasks:
+            key = (task[0], task[1])
+            if key not in seen:
+                seen.add(key)
+                unique.append(task)
+        if len(unique) < len(tasks):
+            logger.info(f"Skipping {len(tasks) - len(unique)} duplicate item(s)")
+        tasks = unique
+
+        request_id = result.request_id
         callback = result.progress_callback
+        result.total_items = max(len(tasks), 1)
+        if request_id:
+            DownloadProgressStore.update(request_id, total_items=result.total_items)
 
         def _worker(task: tuple[str, str, dict]) -> None:
             url, mode, cfg = task
@@ -2114,9 +2743,7 @@ class OfflinerCore:
                     f"Processing...",
                 )
             # Check cancellation before starting this task
-            if result.request_id and DownloadProgressStore.is_cancelled(
-                result.request_id
-            ):
+            if request_id and DownloadProgressStore.is_cancelled(request_id):
                 logger.info(f"Skipping task due to cancellation: {url}")
                 return
 
@@ -2130,15 +2757,17 @@ class OfflinerCore:
                     break  # success (or handled error inside _download_media)
                 except _ProxyBlockedError as proxy_err:
                     if _proxy_attempt < max_proxy_attempts - 1:
+                        # Re-extract through the next proxy on retry
+                        result.drop_info(url)
                         new_proxy = _proxy_rotator.rotate()
                         logger.warning(
                             f"Proxy blocked for '{url}', rotating to "
                             f"{new_proxy} (attempt "
                             f"{_proxy_attempt + 2}/{max_proxy_attempts})"
                         )
-                        if result.request_id:
+                        if request_id:
                             DownloadProgressStore.update(
-                                result.request_id,
+                                request_id,
                                 detail="Proxy blocked, switching to next proxy…",
                             )
                         continue
@@ -2146,12 +2775,9 @@ class OfflinerCore:
                     logger.error(f"All proxies exhausted for '{url}': {proxy_err}")
                     result.inc_error(mode)
 
-            result.inc_completed()
-            if result.request_id:
-                DownloadProgressStore.update(
-                    result.request_id,
-                    completed_items=result.completed_items,
-                )
+            completed = result.inc_completed()
+            if request_id:
+                DownloadProgressStore.update(request_id, completed_items=completed)
 
         effective_workers = min(max_workers, len(tasks))
 
@@ -2162,9 +2788,7 @@ class OfflinerCore:
             # Wait and propagate worker-level exceptions as log entries
             for fut in concurrent.futures.as_completed(futures):
                 # If cancellation was requested globally, attempt to cancel remaining futures
-                if result.request_id and DownloadProgressStore.is_cancelled(
-                    result.request_id
-                ):
+                if request_id and DownloadProgressStore.is_cancelled(request_id):
                     logger.info("Cancellation requested - cancelling remaining tasks")
                     for f in futures:
                         if not f.done():
@@ -2173,9 +2797,9 @@ class OfflinerCore:
                             except Exception:
                                 pass
                     # Update progress store to reflect cancellation
-                    if result.request_id:
+                    if request_id:
                         DownloadProgressStore.update(
-                            result.request_id,
+                            request_id,
                             status="Cancelled",
                             detail="Cancelled by client disconnect",
                             complete=True,
@@ -2216,7 +2840,7 @@ class OfflinerCore:
             owns_session = False
         else:
             session_id = uuid.uuid4().hex
-            session_dir = self._base_dir / "Downloads" / "Temp" / session_id
+            session_dir = self._temp_dir / session_id
             owns_session = True
 
         try:
@@ -2232,12 +2856,8 @@ class OfflinerCore:
                 progress_callback(5, "Preparing...", "Analyzing request")
 
             # --- URL resolution (unchanged logic) ---
-            data_lower = (data or "").lower()
-            is_yt = any(
-                p in data_lower
-                for p in ("youtube.com", "youtu.be", "music.youtube.com")
-            )
-            is_sp = "spotify.com" in data_lower
+            is_yt = bool(data) and self._YOUTUBE_HOST_RE.search(data) is not None
+            is_sp = bool(data) and self._SPOTIFY_HOST_RE.search(data) is not None
 
             if is_sp:
                 if self.is_playlist_url(data):
@@ -2363,7 +2983,7 @@ class OfflinerCore:
             owns_session = False
         else:
             session_id = uuid.uuid4().hex
-            session_dir = self._base_dir / "Downloads" / "Temp" / session_id
+            session_dir = self._temp_dir / session_id
             owns_session = True
 
         try:
@@ -2469,7 +3089,7 @@ class OfflinerCore:
     ) -> str | None:
         """Compress (if many files), log summary, return final path.
 
-        When *owns_session* is ``True``, the final deliverable is copied to a
+        When *owns_session* is ``True``, the final deliverable is moved to a
         permanent output directory **before** the session directory is removed
         by the caller's ``finally`` block.
         """
@@ -2480,20 +3100,26 @@ class OfflinerCore:
                 progress_callback(92, "Compressing...", "Creating ZIP file")
             path = self.compress_files(filename, files, str(session_dir))
         elif len(files) == 1:
-            path = str(Path(files[0]).resolve())
+            # Recorded paths are built from the (absolute) session dir, so
+            # this normally skips the filesystem round-trip of resolve().
+            path = files[0]
+            if not os.path.isabs(path):
+                path = os.path.normpath(os.path.join(self._base_dir, path))
         else:
             path = None
 
         # When we own the session dir, move the deliverable out before cleanup
         if owns_session and path and Path(path).exists():
-            output_dir = self._ensure_dir(self._base_dir / "Downloads" / "Output")
+            output_dir = self._ensure_dir(self._output_dir)
             dest = output_dir / Path(path).name
             # Avoid name collision
             if dest.exists():
                 stem = dest.stem
                 suffix = dest.suffix
                 dest = output_dir / f"{stem}_{uuid.uuid4().hex[:8]}{suffix}"
-            shutil.copy2(str(path), str(dest))
+            # The session dir is deleted right after, so move rather than
+            # copy: a rename on the same filesystem (copy+unlink otherwise).
+            shutil.move(str(path), str(dest))
             path = str(dest)
 
         if progress_callback:
@@ -2514,19 +3140,40 @@ class OfflinerCore:
             logger.info(f"Downloaded {v} videos")
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _format_duration(seconds: int) -> str:
+        """Format whole seconds as ``"M:SS"`` (memoised; durations repeat a lot)."""
+        minutes, secs = divmod(seconds, 60)
+        return f"{minutes}:{secs:02d}"
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def _parse_duration_str(text: str) -> int:
-        """Parse ``"M:SS"`` or ``"H:MM:SS"`` into total seconds."""
+        """Parse ``"M:SS"`` or ``"H:MM:SS"`` into total seconds (0 if malformed).
+
+        Memoised, and digit-gated instead of relying on ``int()`` raising.
+        """
         if not text:
             return 0
-        parts = text.split(":")
-        try:
-            if len(parts) == 2:
-                return int(parts[0]) * 60 + int(parts[1])
-            if len(parts) == 3:
-                return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
-        except ValueError:
-            pass
-        return 0
+        head, sep, rest = text.partition(":")
+        if not sep:
+            return 0
+        mid, sep, tail = rest.partition(":")
+        if sep:
+            if ":" in tail:
+                return 0
+            fields = (head, mid, tail)
+        else:
+            fields = (head, mid)
+        total = 0
+        for field in fields:
+            # Same leniency as int(): surrounding whitespace and a sign
+            field = field.strip()
+            digits = field[1:] if field[:1] in ("+", "-") else field
+            if not digits.isdecimal():
+                return 0
+            total = total * 60 + int(field)
+        return total
 
 
 # ============================================
@@ -2655,8 +3302,16 @@ _core = OfflinerCore()
 
 # -- Re-exported constants / objects --
 SPONSORBLOCK_CATEGORIES = OfflinerCore.SPONSORBLOCK_CATEGORIES
-ytmusic = _core.ytmusic
-sp = _core._spotify_default  # noqa: SLF001 — kept for backward compat
+
+
+def __getattr__(name: str) -> Any:
+    # ``ytmusic`` / ``sp`` are resolved lazily so the API clients are only
+    # built when a caller actually needs them (PEP 562).
+    if name == "ytmusic":
+        return _core.ytmusic
+    if name == "sp":
+        return _core._spotify_default  # noqa: SLF001 — kept for backward compat
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # -- Thin function wrappers (preserve original signatures) --
@@ -2672,9 +3327,9 @@ def es_url_playlist(url):
     return OfflinerCore.is_playlist_url(url)
 
 
-def obtener_info_media(url, config=None):
+def obtener_info_media(url, config=None, fuente=None):
     """Backward-compatible wrapper for ``OfflinerCore.get_media_info``."""
-    return _core.get_media_info(url, config)
+    return _core.get_media_info(url, config, source=fuente)
 
 
 def detectar_fuente_url(url):
@@ -2737,6 +3392,11 @@ def buscar_cancion_youtube(query):
     return _core.search_youtube(query)
 
 
+def buscar_resultados_youtube(query, limite=5):
+    """Backward-compatible wrapper for ``OfflinerCore.search_youtube_results``."""
+    return _core.search_youtube_results(query, limite)
+
+
 def buscar_en_youtube_music(titulo_video, artista=None):
     """Backward-compatible wrapper for ``OfflinerCore.search_youtube_music``."""
     return _core.search_youtube_music(titulo_video, artista)
@@ -28,6 +28,56 @@ DEFAULT_CONFIG = {
     "cookies_filepath": "",
 }
 
+# Valores aceptados por campo (búsqueda O(1), construidos una sola vez)
+VALID_QUALITIES = frozenset({"min", "avg", "max"})
+VALID_AUDIO_FORMATS = frozenset({"mp3", "wav", "m4a", "flac"})
+VALID_VIDEO_FORMATS = frozenset({"mp4", "mov", "mkv", "webm"})
+VALID_SOURCES = frozenset({"YouTube", "Spotify"})
+
+# Categorías de SponsorBlock -> descripción (fuente única; logic.py las reutiliza)
+SPONSORBLOCK_CATEGORIES = {
+    "sponsor": "Sponsors (promociones pagadas)",
+    "intro": "Intros/Animaciones de entrada",
+    "outro": "Outros/Créditos finales",
+    "selfpromo": "Auto-promoción del creador",
+    "preview": "Previews/Avances",
+    "filler": "Relleno/Contenido no musical",
+    "interaction": "Recordatorios de suscripción/interacción",
+    "music_offtopic": "Partes sin música en videos musicales",
+}
+VALID_SPONSORBLOCK_CATEGORIES = frozenset(SPONSORBLOCK_CATEGORIES)
+
+# Campos de opción única -> valores aceptados
+_CHOICE_FIELDS = (
+    ("Calidad_audio_video", VALID_QUALITIES),
+    ("Formato_audio", VALID_AUDIO_FORMATS),
+    ("Formato_video", VALID_VIDEO_FORMATS),
+    ("Fuente_descarga", VALID_SOURCES),
+)
+
+# Credenciales y fuentes de cookies (se conservan si son texto)
+_TEXT_FIELDS = (
+    "Client_ID",
+    "Secret_ID",
+    "cookies_content",
+    "cookies_filepath",
+)
+
+# Campos booleanos
+_BOOL_FIELDS = (
+    "Descargar_video",
+    "Descargar_audio",
+    "Scrappear_metadata",
+    "Mostrar_tiempo_de_ejecucion",
+    "SponsorBlock_enabled",
+    "Preferir_YouTube_Music",
+)
+
+
+def _is_allowed(value, allowed):
+    """Pertenencia segura: valores JSON no hashables (listas, dicts) no son válidos."""
+    return isinstance(value, str) and value in allowed
+
 
 class ModelFile:
     """Modelo para gestionar la configuración del descargador."""
@@ -44,61 +94,48 @@ class ModelFile:
             dict: Configuración validada y sanitizada
         """
         validated = DEFAULT_CONFIG.copy()
+        get = config_dict.get
 
-        if config_dict.get("Calidad_audio_video") in ["min", "avg", "max"]:
-            validated["Calidad_audio_video"] = config_dict["Calidad_audio_video"]
-
-        if config_dict.get("Formato_audio") in ["mp3", "wav", "m4a", "flac"]:
-            validated["Formato_audio"] = config_dict["Formato_audio"]
-
-        if config_dict.get("Formato_video") in ["mp4", "mov", "mkv", "webm"]:
-            validated["Formato_video"] = config_dict["Formato_video"]
+        # Campos de opción única
+        for field, allowed in _CHOICE_FIELDS:
+            value = get(field)
+            if _is_allowed(value, allowed):
+                validated[field] = value
 
         # Preserve credentials and cookie sources when provided.
-        for text_field in [
-            "Client_ID",
-            "Secret_ID",
-            "cookies_content",
-            "cookies_filepath",
-        ]:
-            value = config_dict.get(text_field)
+        for field in _TEXT_FIELDS:
+            value = get(field)
             if isinstance(value, str):
-                validated[text_field] = value
+                validated[field] = value
 
         # Campos booleanos
-        bool_fields = [
-            "Descargar_video",
-            "Descargar_audio",
-            "Scrappear_metadata",
-            "Mostrar_tiempo_de_ejecucion",
-            "SponsorBlock_enabled",
-            "Preferir_YouTube_Music",
-        ]
-
-        for field in bool_fields:
-            if isinstance(config_dict.get(field), bool):
-                validated[field] = config_dict[field]
-
-        # Validar Fuente_descarga
-        if config_dict.get("Fuente_descarga") in ["YouTube", "Spotify"]:
-            validated["Fuente_descarga"] = config_dict["Fuente_descarga"]
+        for field in _BOOL_FIELDS:
+            value = get(field)
+            if type(value) is bool:
+                validated[field] = value
 
         # Validar categorías de SponsorBlock
-        valid_categories = [
-            "sponsor",
-            "intro",
-            "outro",
-            "selfpromo",
-            "preview",
-            "filler",
-            "interaction",
-            "music_offtopic",
-        ]
-        if isinstance(config_dict.get("SponsorBlock_categories"), list):
-            validated["SponsorBlock_categories"] = [
-                cat
-                for cat in config_dict["SponsorBlock_categories"]
-                if cat in valid_categories
-            ]
+        categories = cls.filter_sponsorblock_categories(get("SponsorBlock_categories"))
+        if categories is not None:
+            validated["SponsorBlock_categories"] = categories
 
         return validated
+
+    @staticmethod
+    def filter_sponsorblock_categories(categories):
+        """
+        Filtra una lista de categorías de SponsorBlock.
+
+        Args:
+            categories: Valor recibido (normalmente una lista JSON)
+
+        Returns:
+            list | None: Solo las categorías válidas, o None si no es una lista
+        """
+        if not isinstance(categories, list):
+            return None
+        return [
+            cat
+            for cat in categories
+            if _is_allowed(cat, VALID_SPONSORBLOCK_CATEGORIES)
+        ]
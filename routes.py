@@ -4,17 +4,38 @@ Contains all @app.route endpoints.
 """
 
 import os
-import uuid
+import functools
+import hashlib
+import heapq
+import itertools
 import json
+import secrets
 import time
 import threading
 import shutil
 import logging
-import yt_dlp
+import unicodedata
+import urllib.parse
+from dataclasses import dataclass
+from queue import SimpleQueue
 from typing import Any
 
 import redis as _redis
 
+# Optional: orjson for request parsing and the SSE stream. Its decode error
+# subclasses json.JSONDecodeError, so existing handlers keep working.
+try:
+    import orjson as _orjson
+
+    _json_dumpb = _orjson.dumps
+    _json_loads = _orjson.loads
+except ImportError:
+
+    def _json_dumpb(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    _json_loads = json.loads
+
 try:
     from rq import Queue as _RQQueue
 
@@ -38,14 +59,33 @@ from datetime import datetime, timedelta
 
 from models.ModelFile import ModelFile, DEFAULT_CONFIG
 from config import get_config
+import logic
+from logic import (
+    DownloadProgressStore,
+    OfflinerCore,
+    buscar_resultados_youtube,
+    detectar_fuente_url,
+    es_url_playlist,
+    execute_download_task,
+    extraer_video_id_youtube,
+    obtener_info_media,
+    obtener_info_playlist,
+    obtener_segmentos_sponsorblock,
+)
 
 # Base directory for the application
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Per-task download directories live under here (matches OfflinerCore)
+DOWNLOADS_TEMP_DIR = os.path.join(BASE_DIR, "Downloads", "Temp")
 logger = logging.getLogger(__name__)
 
 # Get configuration
 app_config = get_config()
 
+# DEFAULT_CONFIG never changes at runtime: serialise it (and its ETag) once.
+_DEFAULT_CONFIG_JSON = _json_dumpb(DEFAULT_CONFIG)
+_DEFAULT_CONFIG_ETAG = hashlib.sha1(_DEFAULT_CONFIG_JSON).hexdigest()
+
 # ============================================
 # Redis & RQ Queue — initialised once per process
 # ============================================
@@ -85,18 +125,141 @@ def get_rq_queue() -> Any | None:
     return _task_queue
 
 
+# ============================================
+# Delayed cleanup — one reaper thread for the whole process
+# ============================================
+# Finished downloads schedule their temp-dir/progress cleanup here instead of
+# each starting a sleeping Timer thread. Entries are ordered by deadline; the
+# sequence number keeps ties from comparing the callables themselves.
+
+_reap_heap: list[tuple[float, int, Any]] = []
+_reap_cv = threading.Condition()
+_reap_seq = itertools.count()
+_reaper_thread: threading.Thread | None = None
+
+
+def _reaper() -> None:
+    """Run scheduled callbacks as their deadlines pass."""
+    while True:
+        with _reap_cv:
+            while not _reap_heap:
+                _reap_cv.wait()
+            deadline, _, fn = _reap_heap[0]
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                _reap_cv.wait(remaining)
+                continue
+            heapq.heappop(_reap_heap)
+        try:
+            fn()
+        except Exception:
+            logger.exception("Scheduled cleanup failed")
+
+
+def _schedule_cleanup(delay: float, fn) -> None:
+    """Run *fn* on the reaper thread after *delay* seconds."""
+    global _reaper_thread  # noqa: PLW0603
+
+    with _reap_cv:
+        heapq.heappush(_reap_heap, (time.monotonic() + delay, next(_reap_seq), fn))
+        # Started lazily (and restarted if missing) so forked workers get one
+        if _reaper_thread is None or not _reaper_thread.is_alive():
+            _reaper_thread = threading.Thread(
+                target=_reaper, name="offliner-reaper", daemon=True
+            )
+            _reaper_thread.start()
+        _reap_cv.notify()
+
+
+class _DaemonPool:
+    """Fire-and-forget worker pool on daemon threads.
+
+    ThreadPoolExecutor workers are joined at interpreter exit, so one
+    in-flight job would hold up shutdown (and a gunicorn worker reload).
+    Like the reaper, threads start on demand so forked workers get their own.
+    """
+
+    def __init__(self, max_workers: int, name: str) -> None:
+        self._max_workers = max(1, max_workers)
+        self._name = name
+        self._jobs: SimpleQueue = SimpleQueue()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def submit(self, fn, /, *args, **kwargs) -> None:
+        """Queue ``fn(*args, **kwargs)`` for the next free worker."""
+        self._jobs.put((fn, args, kwargs))
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            if len(self._threads) < self._max_workers:
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f"{self._name}-{len(self._threads)}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self) -> None:
+        while True:
+            fn, args, kwargs = self._jobs.get()
+            try:
+                fn(*args, **kwargs)
+            except Exception:
+                logger.exception("Background job failed (%s)", self._name)
+
+
+# Deleting a finished download's temp dir (possibly multi-GB) is pure unlink
+# I/O; it runs here so neither the response thread nor the reaper waits on it.
+_CLEANUP_POOL = _DaemonPool(2, "offliner-cleanup")
+
+
 # ============================================
 # Progress Manager — backed by DownloadProgressStore in logic.py
 # ============================================
-# Imported lazily to avoid circular imports.
 # DownloadProgressStore is the thread-safe global store for SSE progress.
 
 
-def _get_progress_store():
-    """Lazy import of DownloadProgressStore to avoid circular imports."""
-    from logic import DownloadProgressStore
+# Longest an SSE stream waits for a progress change before a keep-alive.
+_SSE_KEEPALIVE_SECONDS = 15
+
+
+def _wait_for_publish(events, timeout: float) -> bool:
+    """Block until a progress notification arrives on *events* or *timeout* ends.
+
+    ``get_message`` returns ``None`` straight away for an (ignored) subscribe
+    confirmation, so only real ``message`` publishes end the wait early.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        message = events.get_message(timeout=remaining)
+        if message is not None and message.get("type") == "message":
+            return True
+
+
+def _x_accel_uri(file_path: str) -> str | None:
+    """Internal nginx URI for *file_path*, or None when offload is off/unsafe."""
+    prefix = app_config.X_ACCEL_REDIRECT_PREFIX
+    if not prefix:
+        return None
+    rel = os.path.relpath(os.path.realpath(file_path), BASE_DIR)
+    if rel.startswith(os.pardir):
+        # Outside the aliased project directory: let Flask serve it
+        return None
+    return prefix.rstrip("/") + "/" + urllib.parse.quote(rel.replace(os.sep, "/"))
 
-    return DownloadProgressStore
+
+def _attachment_header(filename: str) -> str:
+    """Content-Disposition value matching what ``send_file`` emits."""
+    if filename.isascii():
+        return f"attachment; filename=\"{filename}\""
+    simple = unicodedata.normalize("NFKD", filename)
+    simple = simple.encode("ascii", "ignore").decode("ascii")
+    quoted = urllib.parse.quote(filename, safe="!#$&+^`|")
+    return f"attachment; filename=\"{simple}\"; filename*=UTF-8''{quoted}"
 
 
 def _get_request_ip() -> str:
@@ -115,10 +278,12 @@ def _get_request_ip() -> str:
     return request.remote_addr or "unknown"
 
 
+# Downloads run here when RQ is unavailable; extra requests wait in the queue
+_download_pool = _DaemonPool(app_config.LOCAL_DOWNLOAD_WORKERS, "offliner-download")
+
+
 def _enqueue_download_task(app, **job_kwargs):
     """Enqueue downloads on RQ when available, otherwise use a local thread."""
-    from logic import execute_download_task
-
     queue = get_rq_queue()
     if queue is not None:
         queue.enqueue(
@@ -129,13 +294,9 @@ def _enqueue_download_task(app, **job_kwargs):
         return
 
     app.logger.warning(
-        "RQ is unavailable in this environment; using in-process background execution for this download."
+        "RQ is unavailable in this environment; queueing this download on the in-process worker pool."
     )
-    threading.Thread(
-        target=execute_download_task,
-        kwargs=job_kwargs,
-        daemon=True,
-    ).start()
+    _download_pool.submit(execute_download_task, **job_kwargs)
 
 
 # ============================================
@@ -143,11 +304,20 @@ def _enqueue_download_task(app, **job_kwargs):
 # ============================================
 
 
+@dataclass(frozen=True, slots=True)
+class _DownloadEntry:
+    """A single recorded item (immutable, so it can be shared between lists)."""
+
+    timestamp: datetime
+    duration: float
+
+
 class DownloadTracker:
     """Thread-safe tracker for user downloads with hourly and daily limits."""
 
     def __init__(self):
-        self._downloads = {}  # {ip: {'hourly': [...], 'daily': [...]}}
+        # {ip: {'hourly': [_DownloadEntry, ...], 'daily': [_DownloadEntry, ...]}}
+        self._downloads = {}
         self._lock = threading.Lock()
 
     def _clean_old_entries(self, ip):
@@ -161,14 +331,14 @@ class DownloadTracker:
             self._downloads[ip]["hourly"] = [
                 entry
                 for entry in self._downloads[ip]["hourly"]
-                if entry["timestamp"] > one_hour_ago
+                if entry.timestamp > one_hour_ago
             ]
 
             # Clean daily entries
             self._downloads[ip]["daily"] = [
                 entry
                 for entry in self._downloads[ip]["daily"]
-                if entry["timestamp"] > one_day_ago
+                if entry.timestamp > one_day_ago
             ]
 
     def check_limits(
@@ -206,8 +376,8 @@ class DownloadTracker:
             daily_count = len(daily)
 
             # Calculate total duration
-            hourly_duration = sum(entry.get("duration", 0) for entry in hourly)
-            daily_duration = sum(entry.get("duration", 0) for entry in daily)
+            hourly_duration = sum(entry.duration for entry in hourly)
+            daily_duration = sum(entry.duration for entry in daily)
 
             # Check content duration limit
             duration_minutes = duration_seconds / 60
@@ -292,12 +462,12 @@ class DownloadTracker:
             now = datetime.utcnow()
             safe_item_count = max(1, int(item_count or 1))
             per_item_duration = duration_seconds / safe_item_count
-            entry = {"timestamp": now, "duration": per_item_duration}
+            entry = _DownloadEntry(now, per_item_duration)
 
-            # Record for both hourly and daily tracking
-            for _ in range(safe_item_count):
-                self._downloads[ip]["hourly"].append(entry.copy())
-                self._downloads[ip]["daily"].append(entry.copy())
+            # Record for both hourly and daily tracking; the entry is frozen,
+            # so one instance is shared instead of copied per slot.
+            self._downloads[ip]["hourly"].extend([entry] * safe_item_count)
+            self._downloads[ip]["daily"].extend([entry] * safe_item_count)
 
             self._clean_old_entries(ip)
 
@@ -412,7 +582,12 @@ def register_routes(app, limiter):
     @app.route("/get_default_config")
     def get_default_config():
         """Returns default configuration to initialize localStorage."""
-        return jsonify(DEFAULT_CONFIG)
+        response = Response(_DEFAULT_CONFIG_JSON, mimetype="application/json")
+        response.cache_control.public = True
+        response.cache_control.max_age = 3600
+        response.set_etag(_DEFAULT_CONFIG_ETAG)
+        # Answers a matching If-None-Match with an empty 304
+        return response.make_conditional(request)
 
     @app.route("/playlist_info", methods=["POST"])
     @limiter.limit(app_config.RATE_LIMIT_PLAYLIST)
@@ -426,15 +601,13 @@ def register_routes(app, limiter):
             config_json = request.form.get("user_config", "{}")
 
             try:
-                user_config = ModelFile.validate_config(json.loads(config_json))
+                user_config = ModelFile.validate_config(_json_loads(config_json))
             except json.JSONDecodeError:
                 user_config = DEFAULT_CONFIG.copy()
 
             if not url:
                 return jsonify({"error": "Please enter a playlist URL."}), 400
 
-            from logic import obtener_info_playlist, es_url_playlist
-
             if not es_url_playlist(url):
                 return (
                     jsonify(
@@ -512,8 +685,6 @@ def register_routes(app, limiter):
             if not url:
                 return jsonify({"es_playlist": False})
 
-            from logic import es_url_playlist
-
             es_playlist = es_url_playlist(url)
 
             return jsonify({"es_playlist": es_playlist, "url": url})
@@ -539,8 +710,8 @@ def register_routes(app, limiter):
 
             if prefer_ytmusic:
                 app.logger.info(f"Searching YouTube Music for: {query}")
-                from logic import ytmusic
-
+                # Resolved per call: logic builds the client lazily (PEP 562)
+                ytmusic = logic.ytmusic
                 if not ytmusic:
                     return jsonify({"error": "YouTube Music not available"}), 503
 
@@ -549,21 +720,11 @@ def register_routes(app, limiter):
                     if not results:
                         results = ytmusic.search(query, limit=5)
 
+                    # Shared memoised "M:SS"/"H:MM:SS" parser, no per-row try/except
+                    parse_duration = OfflinerCore._parse_duration_str
                     for entry in results[:5]:
                         duration_str = entry.get("duration", "0:00")
-                        duration_seconds = 0
-                        try:
-                            parts = duration_str.split(":")
-                            if len(parts) == 2:
-                                duration_seconds = int(parts[0]) * 60 + int(parts[1])
-                            elif len(parts) == 3:
-                                duration_seconds = (
-                                    int(parts[0]) * 3600
-                                    + int(parts[1]) * 60
-                                    + int(parts[2])
-                                )
-                        except:
-                            pass
+                        duration_seconds = parse_duration(duration_str)
 
                         thumbnails = entry.get("thumbnails", [])
                         thumbnail_url = thumbnails[-1]["url"] if thumbnails else ""
@@ -592,46 +753,36 @@ def register_routes(app, limiter):
             else:
                 app.logger.info(f"Searching YouTube for: {query}")
 
-                ydl_opts = {
-                    "quiet": True,
-                    "extract_flat": True,
-                    "noplaylist": True,
-                    "nocheckcertificate": True,
-                }
-
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    result = ydl.extract_info(f"ytsearch5:{query}", download=False)
+                result = buscar_resultados_youtube(query, 5)
 
-                    if "entries" not in result:
-                        return jsonify({"error": "No results found"}), 404
+                if "entries" not in result:
+                    return jsonify({"error": "No results found"}), 404
 
-                    for entry in result["entries"]:
-                        duration = entry.get("duration", 0)
-                        if isinstance(duration, (int, float)):
-                            minutes = int(duration // 60)
-                            seconds = int(duration % 60)
-                            duration_str = f"{minutes}:{seconds:02d}"
-                        else:
-                            duration_str = str(duration)
+                for entry in result["entries"]:
+                    duration = entry.get("duration", 0)
+                    if isinstance(duration, (int, float)):
+                        duration_str = OfflinerCore._format_duration(int(duration))
+                    else:
+                        duration_str = str(duration)
 
-                        video_id = entry.get("id", "")
+                    video_id = entry.get("id", "")
 
-                        search_results.append(
-                            {
-                                "id": video_id,
-                                "video_id": video_id,
-                                "titulo": entry.get("title"),
-                                "url": entry.get("url")
-                                or f"https://www.youtube.com/watch?v={video_id}",
-                                "thumbnail": entry.get("thumbnail")
-                                or f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
-                                "autor": entry.get("uploader")
-                                or entry.get("channel", "Unknown"),
-                                "duracion": duration_str,
-                                "duracion_segundos": duration,
-                                "fuente": "youtube",
-                            }
-                        )
+                    search_results.append(
+                        {
+                            "id": video_id,
+                            "video_id": video_id,
+                            "titulo": entry.get("title"),
+                            "url": entry.get("url")
+                            or f"https://www.youtube.com/watch?v={video_id}",
+                            "thumbnail": entry.get("thumbnail")
+                            or f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+                            "autor": entry.get("uploader")
+                            or entry.get("channel", "Unknown"),
+                            "duracion": duration_str,
+                            "duracion_segundos": duration,
+                            "fuente": "youtube",
+                        }
+                    )
 
             if not search_results:
                 return jsonify({"error": "No results found"}), 404
@@ -669,21 +820,19 @@ def register_routes(app, limiter):
             config_json = request.form.get("user_config", "{}")
 
             try:
-                user_config = ModelFile.validate_config(json.loads(config_json))
+                user_config = ModelFile.validate_config(_json_loads(config_json))
             except json.JSONDecodeError:
                 user_config = DEFAULT_CONFIG.copy()
 
             if not url:
                 return jsonify({"error": "Empty URL"}), 400
 
-            from logic import obtener_info_media, es_url_playlist, detectar_fuente_url
-
+            # Classify once and hand the result to obtener_info_media
+            fuente = detectar_fuente_url(url)
             if es_url_playlist(url):
-                return jsonify(
-                    {"es_playlist": True, "fuente": detectar_fuente_url(url)}
-                )
+                return jsonify({"es_playlist": True, "fuente": fuente})
 
-            info = obtener_info_media(url, user_config)
+            info = obtener_info_media(url, user_config, fuente)
 
             if not info:
                 return jsonify({"error": "Could not get information"}), 400
@@ -691,8 +840,6 @@ def register_routes(app, limiter):
             # Extract video_id if it's a YouTube video
             video_id = None
             if info.get("fuente") in ["youtube", "youtube_music"]:
-                from logic import extraer_video_id_youtube
-
                 video_id = extraer_video_id_youtube(url)
 
             return jsonify(
@@ -729,11 +876,12 @@ def register_routes(app, limiter):
                 return jsonify({"error": "Video ID required"}), 400
 
             try:
-                categories = json.loads(categories_json)
+                categories = _json_loads(categories_json)
             except json.JSONDecodeError:
                 categories = None
-
-            from logic import obtener_segmentos_sponsorblock
+            # Same whitelist as the saved config; unknown entries are dropped
+            # and an empty result falls back to every category.
+            categories = ModelFile.filter_sponsorblock_categories(categories) or None
 
             sb_info = obtener_segmentos_sponsorblock(video_id, categories)
 
@@ -784,7 +932,7 @@ def register_routes(app, limiter):
 
             # Parse configuration
             try:
-                user_config = json.loads(config_json)
+                user_config = _json_loads(config_json)
                 user_config = ModelFile.validate_config(user_config)
             except json.JSONDecodeError:
                 user_config = DEFAULT_CONFIG.copy()
@@ -792,7 +940,7 @@ def register_routes(app, limiter):
             # Parse individual item configurations
             try:
                 item_configs = (
-                    json.loads(item_configs_json) if item_configs_json else {}
+                    _json_loads(item_configs_json) if item_configs_json else {}
                 )
             except json.JSONDecodeError:
                 item_configs = {}
@@ -804,7 +952,7 @@ def register_routes(app, limiter):
 
             if is_playlist_mode and selected_urls_json:
                 try:
-                    selected_urls = json.loads(selected_urls_json)
+                    selected_urls = _json_loads(selected_urls_json)
                     if not selected_urls:
                         return (
                             jsonify(
@@ -826,8 +974,6 @@ def register_routes(app, limiter):
 
                     # Calculate total duration from selected items
                     item_count = len(selected_urls)
-                    from logic import obtener_info_media
-
                     for url_data in selected_urls:
                         item_url = None
                         item_duration = 0
@@ -880,8 +1026,6 @@ def register_routes(app, limiter):
                 # Single item - get duration
                 item_count = 1
                 try:
-                    from logic import obtener_info_media
-
                     media_info = obtener_info_media(input_url, user_config)
                     if media_info:
                         total_duration = _get_duration_from_media_info(media_info)
@@ -944,18 +1088,14 @@ def register_routes(app, limiter):
                     429,  # Too Many Requests
                 )
 
-            task_id = str(uuid.uuid4())
-            ProgressStore = _get_progress_store()
-            ProgressStore.create(task_id)
-
-            nombre_archivo = f"descarga-{uuid.uuid4()}.zip"
-            temp_dir = os.path.join(BASE_DIR, "Downloads", "Temp", task_id)
-
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir, ignore_errors=True)
+            task_id = secrets.token_hex(16)
+            nombre_archivo = f"descarga-{secrets.token_hex(8)}.zip"
+            temp_dir = os.path.join(DOWNLOADS_TEMP_DIR, task_id)
+            # task_id is a fresh random token, so there is nothing to clear first
             os.makedirs(temp_dir, exist_ok=True)
 
-            ProgressStore.update(task_id, temp_dir=temp_dir)
+            # Single write: the entry is created with temp_dir already set.
+            DownloadProgressStore.create(task_id, temp_dir=temp_dir)
 
             # --- Enqueue download task on RQ (replaces threading.Thread) ---
             _enqueue_download_task(
@@ -987,32 +1127,54 @@ def register_routes(app, limiter):
     @app.route("/stream_progress/<request_id>")
     def stream_progress(request_id):
         """SSE endpoint for real-time download progress."""
-        ProgressStore = _get_progress_store()
 
         def generate():
-            while True:
-                progress = ProgressStore.get(request_id)
-                data = json.dumps(progress)
-                try:
-                    yield f"data: {data}\n\n"
-                except (GeneratorExit, BrokenPipeError, ConnectionResetError, OSError):
-                    # Client disconnected; request cancellation of server-side work
+            # Woken by the store's pub/sub notifications instead of polling;
+            # the timeout doubles as a keep-alive that also detects clients
+            # that went away while nothing was changing.
+            events = DownloadProgressStore.subscribe(request_id)
+            last_data = None
+            try:
+                while True:
+                    progress = DownloadProgressStore.get(request_id)
+                    data = _json_dumpb(progress)
                     try:
-                        ProgressStore.request_cancel(request_id)
-                        ProgressStore.update(
-                            request_id,
-                            status="Client disconnected",
-                            detail="Cancelling on client disconnect...",
-                            phase="cancelled",
-                        )
-                    except Exception:
-                        app.logger.exception("Failed to request cancel on disconnect")
-                    break
+                        if data != last_data:
+                            yield b"data: " + data + b"\n\n"
+                            last_data = data
+                        else:
+                            yield b": keep-alive\n\n"
+                    except (
+                        GeneratorExit,
+                        BrokenPipeError,
+                        ConnectionResetError,
+                        OSError,
+                    ):
+                        # Client disconnected; request cancellation of server-side work
+                        try:
+                            DownloadProgressStore.request_cancel(request_id)
+                            DownloadProgressStore.update(
+                                request_id,
+                                status="Client disconnected",
+                                detail="Cancelling on client disconnect...",
+                                phase="cancelled",
+                            )
+                        except Exception:
+                            app.logger.exception(
+                                "Failed to request cancel on disconnect"
+                            )
+                        break
 
-                if progress.get("complete") or progress.get("error"):
-                    break
+                    if progress.get("complete") or progress.get("error"):
+                        break
 
-                time.sleep(0.3)
+                    # Block until the next change, then drain any queued
+                    # notifications so a burst of updates costs one read.
+                    if _wait_for_publish(events, _SSE_KEEPALIVE_SECONDS):
+                        while events.get_message(timeout=0):
+                            pass
+            finally:
+                events.close()
 
         return Response(
             stream_with_context(generate()),
@@ -1027,8 +1189,7 @@ def register_routes(app, limiter):
     @app.route("/download_file/<request_id>")
     def download_file(request_id):
         """Serve the completed download file and clean up."""
-        ProgressStore = _get_progress_store()
-        progress = ProgressStore.get(request_id)
+        progress = DownloadProgressStore.get(request_id)
         file_path = progress.get("file_path")
         temp_dir_path = progress.get("temp_dir")
 
@@ -1037,27 +1198,47 @@ def register_routes(app, limiter):
 
         filename = os.path.basename(file_path)
 
+        def _cleanup_temp_dir():
+            try:
+                if temp_dir_path:
+                    shutil.rmtree(temp_dir_path, ignore_errors=True)
+                    app.logger.info(f"Temp directory cleaned: {temp_dir_path}")
+            except Exception as e:
+                app.logger.error(f"Error cleaning temp dir: {e}")
+
+        def _remove_progress():
+            DownloadProgressStore.remove(request_id)
+
+        accel_uri = _x_accel_uri(file_path)
+        if accel_uri:
+            # nginx streams the file with sendfile(2) after this (empty)
+            # response has been closed, so cleanup must wait for it.
+            response = Response(status=200)
+            response.headers["X-Accel-Redirect"] = accel_uri
+            response.headers["Content-Type"] = "application/octet-stream"
+            response.headers["Content-Disposition"] = _attachment_header(filename)
+            delay = app_config.X_ACCEL_CLEANUP_DELAY
+            _schedule_cleanup(
+                delay, functools.partial(_CLEANUP_POOL.submit, _cleanup_temp_dir)
+            )
+            _schedule_cleanup(delay, _remove_progress)
+            return response
+
         response = send_file(
             file_path,
             as_attachment=True,
             download_name=filename,
+            conditional=True,
+            etag=False,
+            max_age=0,
         )
 
         @response.call_on_close
         def _cleanup():
-            try:
-                if temp_dir_path and os.path.exists(temp_dir_path):
-                    shutil.rmtree(temp_dir_path, ignore_errors=True)
-                    app.logger.info(f"Temp directory cleaned: {temp_dir_path}")
-            except Exception as e:
-                app.logger.error(f"Error cleaning temp dir: {e}")
+            _CLEANUP_POOL.submit(_cleanup_temp_dir)
 
             # Delayed removal of progress store entry
-            def _delayed():
-                time.sleep(30)
-                ProgressStore.remove(request_id)
-
-            threading.Thread(target=_delayed, daemon=True).start()
+            _schedule_cleanup(30, _remove_progress)
 
         return response
 